@@ -1,20 +1,70 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from operator import itemgetter
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
 import json
+import math
 import os
+import threading
+import time
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib codec
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+# Name normalization: drop periods/apostrophes, treat hyphens as spaces
+_NAME_TRANSLATION = str.maketrans({'.': None, "'": None, '-': ' '})
+
+
+def _json_loads(data: bytes):
+    """Decode JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj) -> bytes:
+    """Encode an object as indented JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, indent=2).encode('utf-8')
+
+
 class ADPDataSource:
     """Integration with Fantasy Football Calculator and other ADP sources"""
     
-    def __init__(self):
+    def __init__(self, session: Optional[requests.Session] = None):
         self.base_url = "https://fantasyfootballcalculator.com/api/v1/adp"
         self.cache_duration = timedelta(hours=6)  # Cache for 6 hours
         self.cache_file = "adp_cache.json"
         
+        # In-memory cache: (format, teams, year) -> (monotonic expiry, data)
+        self._mem_cache: Dict[tuple, tuple] = {}
+        self._cache_lock = threading.Lock()
+        
+        # (format, year) -> (ADP list, name/position index) for history lookups
+        self._history_index: Dict[tuple, tuple] = {}
+        
+        # Pooled keep-alive session so repeated FFC requests reuse connections;
+        # callers that already hold a pooled session can share it instead
+        if session is None:
+            session = requests.Session()
+            retries = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+            session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retries))
+            session.headers.update({
+                'Accept-Encoding': 'gzip',
+                'User-Agent': 'ff-draft-assistant/1.0'
+            })
+        self.session = session
+        
         # Backup ADP sources (if primary fails)
         self.backup_sources = [
             "https://www.fantasypros.com/nfl/adp/",  # Requires scraping
@@ -35,18 +85,18 @@ class ADPDataSource:
         # Check cache first
         cached_data = self._get_cached_data(format_type, teams, year)
         if cached_data:
-            logger.info(f"Using cached ADP data for {format_type}")
+            logger.info("Using cached ADP data for %s", format_type)
             return cached_data
         
         url = f"{self.base_url}/{format_type}"
         params = {'teams': teams, 'year': year}
         
         try:
-            logger.info(f"Fetching ADP data from {url} with params {params}")
-            response = requests.get(url, params=params, timeout=10)
+            logger.info("Fetching ADP data from %s with params %s", url, params)
+            response = self.session.get(url, params=params, timeout=10)
             response.raise_for_status()
             
-            data = response.json()
+            data = _json_loads(response.content)
             
             # Process and standardize the data
             processed_data = self._process_ffc_data(data, format_type)
@@ -54,17 +104,17 @@ class ADPDataSource:
             # Cache the results
             self._cache_data(processed_data, format_type, teams, year)
             
-            logger.info(f"Successfully fetched {len(processed_data)} ADP entries")
+            logger.info("Successfully fetched %d ADP entries", len(processed_data))
             return processed_data
             
         except requests.RequestException as e:
-            logger.error(f"Error fetching ADP data from FFC: {e}")
+            logger.error("Error fetching ADP data from FFC: %s", e)
             return self._get_backup_adp_data(format_type, teams, year)
         except json.JSONDecodeError as e:
-            logger.error(f"Invalid JSON response from FFC: {e}")
+            logger.error("Invalid JSON response from FFC: %s", e)
             return None
         except Exception as e:
-            logger.error(f"Unexpected error fetching ADP data: {e}")
+            logger.error("Unexpected error fetching ADP data: %s", e)
             return None
     
     def get_multi_format_adp(self, teams=12, year=None) -> Dict[str, List[Dict]]:
@@ -72,11 +122,14 @@ class ADPDataSource:
         formats = ['standard', 'ppr', 'half-ppr']
         all_adp = {}
         
-        for format_type in formats:
-            data = self.get_adp_data(format_type, teams, year)
+        # Fetches are network bound, so run them concurrently
+        with ThreadPoolExecutor(max_workers=len(formats)) as executor:
+            results = executor.map(lambda f: (f, self.get_adp_data(f, teams, year)), formats)
+        
+        for format_type, data in results:
             if data:
                 all_adp[format_type] = data
-                logger.info(f"Retrieved {len(data)} players for {format_type}")
+                logger.info("Retrieved %d players for %s", len(data), format_type)
         
         return all_adp
     
@@ -92,8 +145,9 @@ class ADPDataSource:
             for player in players:
                 player_key = self._create_player_key(player)
                 
-                if player_key not in player_adp:
-                    player_adp[player_key] = {
+                player_data = player_adp.get(player_key)
+                if player_data is None:
+                    player_data = player_adp[player_key] = {
                         'name': player['name'],
                         'position': player['position'],
                         'team': player.get('team', ''),
@@ -102,69 +156,71 @@ class ADPDataSource:
                         'formats_count': 0
                     }
                 
-                player_adp[player_key]['adp_data'][format_type] = player['adp']
-                player_adp[player_key]['formats_count'] += 1
+                player_data['adp_data'][format_type] = player['adp']
+                player_data['formats_count'] += 1
         
-        # Calculate consensus ADP (average across formats)
+        # Calculate consensus ADP (average across formats with a known ADP)
         consensus_players = []
-        for player_key, player_data in player_adp.items():
-            adp_values = list(player_data['adp_data'].values())
+        for player_data in player_adp.values():
+            adp_values = [adp for adp in player_data['adp_data'].values() if adp is not None]
             if adp_values:
-                player_data['consensus_adp'] = round(sum(adp_values) / len(adp_values), 1)
+                player_data['consensus_adp'] = round(math.fsum(adp_values) / len(adp_values), 1)
                 consensus_players.append(player_data)
         
         # Sort by consensus ADP
-        consensus_players.sort(key=lambda x: x['consensus_adp'])
+        consensus_players.sort(key=itemgetter('consensus_adp'))
         
-        logger.info(f"Generated consensus ADP for {len(consensus_players)} players")
+        logger.info("Generated consensus ADP for %d players", len(consensus_players))
         return consensus_players
     
-    def merge_adp_with_players(self, players: List[Dict], adp_data: List[Dict]) -> List[Dict]:
-        """Merge ADP data into existing player records"""
+    def merge_adp_with_players(self, players: List[Dict], adp_data: List[Dict],
+                               in_place: bool = False) -> List[Dict]:
+        """Merge ADP data into existing player records
+        
+        By default the input records are left untouched: matched players are
+        returned as new dicts and unmatched players are returned by reference.
+        Callers that own the records can pass ``in_place=True`` to have matched
+        players updated directly instead of copied.
+        """
         # Create ADP lookup dictionary
-        adp_lookup = {}
-        for adp_player in adp_data:
-            key = self._create_player_key(adp_player)
-            adp_lookup[key] = adp_player
+        adp_lookup = {self._create_player_key(adp_player): adp_player for adp_player in adp_data}
         
-        # Merge ADP data into players
+        # Merge ADP data into players; unmatched players are passed through as-is
         updated_players = []
         matched_count = 0
         
         for player in players:
-            player_copy = player.copy()
-            key = self._create_player_key(player)
+            adp_info = adp_lookup.get(self._create_player_key(player))
             
-            if key in adp_lookup:
-                adp_info = adp_lookup[key]
-                player_copy['adp'] = adp_info.get('consensus_adp', adp_info.get('adp'))
-                player_copy['adp_data'] = adp_info.get('adp_data', {})
+            if adp_info is not None:
+                adp = adp_info.get('consensus_adp', adp_info.get('adp'))
+                adp_breakdown = adp_info.get('adp_data', {})
+                if in_place:
+                    player['adp'] = adp
+                    player['adp_data'] = adp_breakdown
+                else:
+                    player = {**player, 'adp': adp, 'adp_data': adp_breakdown}
                 matched_count += 1
             
-            updated_players.append(player_copy)
+            updated_players.append(player)
         
-        logger.info(f"Merged ADP data for {matched_count}/{len(players)} players")
+        logger.info("Merged ADP data for %d/%d players", matched_count, len(players))
         return updated_players
     
     def _process_ffc_data(self, raw_data: Dict, format_type: str) -> List[Dict]:
         """Process raw Fantasy Football Calculator data"""
-        processed = []
-        
-        # Handle different response formats
-        players_data = raw_data.get('players', raw_data)
-        
-        if isinstance(players_data, list):
-            for item in players_data:
-                processed_player = self._process_ffc_player(item, format_type)
-                if processed_player:
-                    processed.append(processed_player)
-        elif isinstance(players_data, dict):
-            for player_data in players_data.values():
-                processed_player = self._process_ffc_player(player_data, format_type)
-                if processed_player:
-                    processed.append(processed_player)
-        
-        return processed
+        # Handle different response formats: a bare list, or a dict that holds
+        # players either under 'players' or keyed by player id
+        players_data = raw_data.get('players', raw_data) if isinstance(raw_data, dict) else raw_data
+        
+        if isinstance(players_data, dict):
+            players_data = players_data.values()
+        elif not isinstance(players_data, list):
+            return []
+        
+        process_player = self._process_ffc_player
+        processed = [process_player(item, format_type) for item in players_data]
+        return [player for player in processed if player]
     
     def _process_ffc_player(self, player_data: Dict, format_type: str) -> Optional[Dict]:
         """Process individual player data from FFC"""
@@ -188,65 +244,112 @@ class ADPDataSource:
             }
             
         except Exception as e:
-            logger.warning(f"Error processing player data: {e}")
+            logger.warning("Error processing player data: %s", e)
             return None
     
     def _create_player_key(self, player: Dict) -> str:
         """Create a consistent key for player matching"""
-        name = player.get('name', '').strip().lower()
-        position = player.get('position', '').upper()
-        team = player.get('team', '').upper()
+        return self._player_key(player.get('name', ''), player.get('position', ''), player.get('team', ''))
+    
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _player_key(name: str, position: str, team: str) -> str:
+        """Normalize raw name/position/team into a player key (memoized)"""
+        name = name.strip().lower()
+        position = position.upper()
+        team = team.upper()
         
         # Normalize name for better matching
-        name = name.replace('.', '').replace("'", '').replace('-', ' ')
-        name = ' '.join(name.split())
+        # Fast path: letters separated by single spaces need no further work
+        if not (name.replace(' ', '').isalpha() and '  ' not in name):
+            # str.split() collapses whitespace runs in C without a regex engine
+            name = ' '.join(name.translate(_NAME_TRANSLATION).split())
         
         return f"{name}_{position}_{team}"
     
     def _get_cached_data(self, format_type: str, teams: int, year: int) -> Optional[List[Dict]]:
-        """Retrieve cached ADP data if still valid"""
+        """Retrieve cached ADP data if still valid
+        
+        The in-memory cache is checked first; the cache file is only read on a
+        miss (e.g. cold start), and any still-valid entries it holds are loaded
+        into memory.
+        """
+        mem_key = (format_type, teams, year)
+        cached = self._mem_cache.get(mem_key)
+        if cached:
+            if time.monotonic() < cached[0]:
+                return cached[1]
+            self._mem_cache.pop(mem_key, None)
+        
         if not os.path.exists(self.cache_file):
             return None
         
         try:
-            with open(self.cache_file, 'r') as f:
-                cache = json.load(f)
-            
-            cache_key = f"{format_type}_{teams}_{year}"
-            
-            if cache_key in cache:
-                cached_entry = cache[cache_key]
-                cache_time = datetime.fromisoformat(cached_entry['timestamp'])
-                
-                if datetime.now() - cache_time < self.cache_duration:
-                    return cached_entry['data']
-        
+            with open(self.cache_file, 'rb') as f:
+                cache = _json_loads(f.read())
         except Exception as e:
-            logger.warning(f"Error reading ADP cache: {e}")
+            logger.warning("Error reading ADP cache: %s", e)
+            return None
         
-        return None
+        ttl = self.cache_duration.total_seconds()
+        now = time.time()
+        now_mono = time.monotonic()
+        
+        for cache_key, cached_entry in cache.items():
+            try:
+                # Timestamps are stored as epoch seconds
+                remaining = ttl - (now - cached_entry['timestamp'])
+                if remaining <= 0:
+                    continue
+                
+                entry_format, entry_teams, entry_year = cache_key.rsplit('_', 2)
+                entry_key = (entry_format, int(entry_teams), int(entry_year))
+                self._mem_cache[entry_key] = (now_mono + remaining, cached_entry['data'])
+            except Exception as e:
+                # Skip malformed entries (e.g. legacy ISO timestamps)
+                logger.debug("Skipping ADP cache entry %s: %s", cache_key, e)
+        
+        cached = self._mem_cache.get(mem_key)
+        return cached[1] if cached else None
     
     def _cache_data(self, data: List[Dict], format_type: str, teams: int, year: int):
-        """Cache ADP data for future use"""
-        try:
-            cache = {}
-            if os.path.exists(self.cache_file):
-                with open(self.cache_file, 'r') as f:
-                    cache = json.load(f)
-            
-            cache_key = f"{format_type}_{teams}_{year}"
-            cache[cache_key] = {
-                'data': data,
-                'timestamp': datetime.now().isoformat()
-            }
-            
-            with open(self.cache_file, 'w') as f:
-                json.dump(cache, f, indent=2)
-            
-            logger.debug(f"Cached ADP data for {cache_key}")
-            
-        except Exception as e:
-            logger.warning(f"Error caching ADP data: {e}")
+        """Cache ADP data for future use
+        
+        The in-memory cache is updated immediately; the cache file is written on
+        a background thread so callers never block on disk I/O.
+        """
+        expires_at = time.monotonic() + self.cache_duration.total_seconds()
+        self._mem_cache[(format_type, teams, year)] = (expires_at, data)
+        
+        cache_key = f"{format_type}_{teams}_{year}"
+        writer = threading.Thread(
+            target=self._write_cache_file,
+            args=(cache_key, data, int(time.time())),
+            daemon=True
+        )
+        writer.start()
+    
+    def _write_cache_file(self, cache_key: str, data: List[Dict], timestamp: int):
+        """Persist a single cache entry to the cache file"""
+        with self._cache_lock:
+            try:
+                cache = {}
+                if os.path.exists(self.cache_file):
+                    with open(self.cache_file, 'rb') as f:
+                        cache = _json_loads(f.read())
+                
+                cache[cache_key] = {
+                    'data': data,
+                    'timestamp': timestamp
+                }
+                
+                with open(self.cache_file, 'wb') as f:
+                    f.write(_json_dumps(cache))
+                
+                logger.debug("Cached ADP data for %s", cache_key)
+                
+            except Exception as e:
+                logger.warning("Error caching ADP data: %s", e)
     
     def _get_backup_adp_data(self, format_type: str, teams: int, year: int) -> Optional[List[Dict]]:
         """Fallback to backup ADP sources or mock data"""
@@ -256,6 +359,22 @@ class ADPDataSource:
         # In a real implementation, you might scrape other sites or use mock data
         return None
     
+    def _name_index(self, format_type: str, year: int, data: List[Dict]) -> Dict[tuple, Dict]:
+        """Index an ADP list by (lowercased name, position), keeping the first entry
+        
+        The index is rebuilt only when the underlying ADP list changes.
+        """
+        cached = self._history_index.get((format_type, year))
+        if cached and cached[0] is data:
+            return cached[1]
+        
+        index = {}
+        for player in data:
+            index.setdefault((player['name'].lower(), player['position']), player)
+        
+        self._history_index[(format_type, year)] = (data, index)
+        return index
+    
     def get_player_adp_history(self, player_name: str, position: str, years: List[int] = None) -> Dict:
         """Get historical ADP data for a specific player"""
         if years is None:
@@ -264,17 +383,16 @@ class ADPDataSource:
         
         history = {}
         
-        for year in years:
-            for format_type in ['standard', 'ppr']:
-                data = self.get_adp_data(format_type, year=year)
-                if data:
-                    for player in data:
-                        if (player['name'].lower() == player_name.lower() and 
-                            player['position'] == position.upper()):
-                            
-                            if year not in history:
-                                history[year] = {}
-                            history[year][format_type] = player['adp']
-                            break
+        # Fetch every (year, format) pair concurrently
+        tasks = [(year, format_type) for year in years for format_type in ['standard', 'ppr']]
+        with ThreadPoolExecutor(max_workers=max(1, min(len(tasks), 8))) as executor:
+            results = executor.map(lambda t: (t, self.get_adp_data(t[1], year=t[0])), tasks)
+        
+        lookup_key = (player_name.lower(), position.upper())
+        for (year, format_type), data in results:
+            if data:
+                player = self._name_index(format_type, year, data).get(lookup_key)
+                if player is not None:
+                    history.setdefault(year, {})[format_type] = player['adp']
         
         return history
\ No newline at end of file
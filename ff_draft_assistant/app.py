@@ -1,10 +1,12 @@
 from flask import Flask, render_template, request, jsonify
-from mongo_utils import get_all_players, search_players, update_player_drafted_status
+from mongo_utils import get_all_players, search_players, update_player_drafted_status, insert_players
 from populate_espn import populate_from_espn
-from player_search import PlayerSearchEngine, quick_search, position_search, format_player_display
+from player_search import PlayerSearchEngine, quick_search, position_search
 from nfl_database import NFLPlayerDatabase, create_mock_comprehensive_database
 from nfl_stats_api import NFLStatsAPI
+from orjson_provider import ORJSONProvider, orjson
 from dotenv import load_dotenv
+from pymongo.errors import BulkWriteError
 import logging
 import os
 import json
@@ -12,6 +14,7 @@ import math
 from datetime import datetime
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO)
@@ -21,6 +24,20 @@ logger = logging.getLogger(__name__)
 search_engine = PlayerSearchEngine()
 stats_api = NFLStatsAPI()
 
+# Seconds between background reloads of the search cache; 0 (the default) disables them.
+# Draft picks update the cache in place, so this only matters for out-of-band writes.
+SEARCH_REFRESH_INTERVAL = float(os.getenv('SEARCH_REFRESH_INTERVAL', '0'))
+
+def json_response(obj, status=200):
+    """Encode a large payload straight to bytes, skipping jsonify's str round trip"""
+    if orjson is None:
+        return jsonify(obj), status
+    return app.response_class(
+        orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS),
+        status=status,
+        mimetype='application/json'
+    )
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -41,27 +58,22 @@ def api_players():
     # Use new search engine
     available_only = drafted != 'true' if drafted else True
     
-    # Get all matching players first
-    all_players = search_engine.search_players(
+    # Only the requested page is sliced out and formatted
+    players_page, total_players = search_engine.search_players_page(
         query=query,
         position=position,
         team=team,
-        max_results=1000,  # Get more to paginate
+        page=page,
+        per_page=per_page,
         sort_by=sort_by,
         available_only=available_only
     )
     
     # Calculate pagination
-    total_players = len(all_players)
     total_pages = math.ceil(total_players / per_page)
-    start_idx = (page - 1) * per_page
-    end_idx = start_idx + per_page
+    formatted_players = [search_engine.get_formatted(player) for player in players_page]
     
-    # Get players for current page
-    players_page = all_players[start_idx:end_idx]
-    formatted_players = [format_player_display(player) for player in players_page]
-    
-    return jsonify({
+    return json_response({
         'players': formatted_players,
         'pagination': {
             'page': page,
@@ -100,8 +112,8 @@ def api_search():
         available_only=available_only
     )
     
-    formatted_players = [format_player_display(player) for player in players]
-    return jsonify({
+    formatted_players = [search_engine.get_formatted(player) for player in players]
+    return json_response({
         'players': formatted_players,
         'total': len(formatted_players),
         'query': query,
@@ -127,8 +139,8 @@ def api_position_search(position):
             available_only=False
         )
     
-    formatted_players = [format_player_display(player) for player in players]
-    return jsonify({
+    formatted_players = [search_engine.get_formatted(player) for player in players]
+    return json_response({
         'players': formatted_players,
         'position': position.upper(),
         'total': len(formatted_players)
@@ -138,8 +150,8 @@ def api_position_search(position):
 def api_sleepers():
     """Get sleeper pick recommendations"""
     sleepers = search_engine.get_sleeper_picks()
-    formatted_sleepers = [format_player_display(player) for player in sleepers]
-    return jsonify({
+    formatted_sleepers = [search_engine.get_formatted(player) for player in sleepers]
+    return json_response({
         'sleepers': formatted_sleepers,
         'total': len(formatted_sleepers)
     })
@@ -149,8 +161,8 @@ def api_value_picks():
     """Get value pick recommendations"""
     round_num = int(request.args.get('round', 5))
     value_picks = search_engine.get_value_picks(round_num)
-    formatted_picks = [format_player_display(player) for player in value_picks]
-    return jsonify({
+    formatted_picks = [search_engine.get_formatted(player) for player in value_picks]
+    return json_response({
         'value_picks': formatted_picks,
         'total': len(formatted_picks),
         'round': round_num
@@ -160,8 +172,8 @@ def api_value_picks():
 def api_handcuffs(player_name):
     """Get handcuff suggestions for a player"""
     handcuffs = search_engine.get_handcuff_suggestions(player_name)
-    formatted_handcuffs = [format_player_display(player) for player in handcuffs]
-    return jsonify({
+    formatted_handcuffs = [search_engine.get_formatted(player) for player in handcuffs]
+    return json_response({
         'handcuffs': formatted_handcuffs,
         'player': player_name,
         'total': len(formatted_handcuffs)
@@ -189,8 +201,8 @@ def api_draft_player():
         # Update in database
         success = update_player_drafted_status(player_name, True)
         if success:
-            # Refresh search engine cache
-            search_engine.refresh_cache()
+            # Update just this player in the search cache instead of reloading it
+            search_engine.mark_drafted(player_name, True)
             return jsonify({'success': True, 'message': f'Player {player_name} marked as drafted'})
         else:
             return jsonify({'success': False, 'error': 'Player not found or update failed'}), 404
@@ -211,8 +223,8 @@ def api_undraft_player():
         # Update in database
         success = update_player_drafted_status(player_name, False)
         if success:
-            # Refresh search engine cache
-            search_engine.refresh_cache()
+            # Update just this player in the search cache instead of reloading it
+            search_engine.mark_drafted(player_name, False)
             return jsonify({'success': True, 'message': f'Player {player_name} marked as undrafted'})
         else:
             return jsonify({'success': False, 'error': 'Player not found or update failed'}), 404
@@ -316,7 +328,7 @@ def api_player_detail(player_name):
         # Remove the current player from similar players
         similar_players = [p for p in similar_players if p.get('name') != player['name']][:3]
         
-        player_info['similar_players'] = [format_player_display(p) for p in similar_players]
+        player_info['similar_players'] = [search_engine.get_formatted(p) for p in similar_players]
         
         return jsonify({
             'success': True,
@@ -328,6 +340,14 @@ def api_player_detail(player_name):
         logger.exception(f'Error fetching player details for {player_name}')
         return jsonify({'success': False, 'error': str(e)}), 500
 
+def _insert_allowing_partial(players):
+    """Insert players, tolerating individual write failures in the bulk insert"""
+    try:
+        insert_players(players)
+    except BulkWriteError as e:
+        write_errors = e.details.get('writeErrors', [])
+        logger.warning('Bulk insert partially failed (%d write errors)', len(write_errors))
+
 @app.route('/api/populate-nfl', methods=['POST'])
 def api_populate_nfl():
     """Populate comprehensive NFL player database"""
@@ -339,8 +359,7 @@ def api_populate_nfl():
         if use_mock:
             logger.info('Populating with comprehensive mock NFL database...')
             mock_players = create_mock_comprehensive_database()
-            from mongo_utils import insert_players
-            insert_players(mock_players)
+            _insert_allowing_partial(mock_players)
             
             message = f'Successfully populated {len(mock_players)} mock NFL players'
             logger.info(message)
@@ -353,8 +372,7 @@ def api_populate_nfl():
                 # Fallback to mock data
                 logger.info('Falling back to mock data...')
                 mock_players = create_mock_comprehensive_database()
-                from mongo_utils import insert_players
-                insert_players(mock_players)
+                _insert_allowing_partial(mock_players)
                 message = f'API failed, populated {len(mock_players)} mock NFL players'
             else:
                 message = f'Successfully populated NFL database with up to {max_players} players'
@@ -380,4 +398,7 @@ except Exception as e:
     logger.warning(f'Failed to initialize search engine: {e}')
 
 if __name__ == '__main__':
+    # Under the debug reloader only the child process serves requests
+    if SEARCH_REFRESH_INTERVAL > 0 and os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        search_engine.start_background_refresh(SEARCH_REFRESH_INTERVAL)
     app.run(debug=True, port=4000)
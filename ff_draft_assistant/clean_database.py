@@ -4,8 +4,12 @@ Database cleaning script to remove non-NFL players and add ADP data
 """
 
 import logging
-from typing import List, Dict
-from mongo_utils import get_all_players, insert_players
+import sys
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Dict, Optional
+from mongo_utils import get_all_players, get_position_stats, insert_players
 from player_validator import PlayerDataValidator
 from adp_integration import ADPDataSource
 from nfl_database import NFLPlayerDatabase
@@ -17,13 +21,40 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Upserts per bulk_write round trip when replacing the database contents
+REPLACE_BATCH_SIZE = 1000
+
+POSITION_ORDER = {'QB': 1, 'RB': 2, 'WR': 3, 'TE': 4, 'K': 5, 'DEF': 6}
+
+# Collaborators are shared per process so lookup tables, roster caches and
+# ADP caches built by one DatabaseCleaner stay warm for the next
+@lru_cache(maxsize=1)
+def _validator() -> PlayerDataValidator:
+    return PlayerDataValidator()
+
+@lru_cache(maxsize=1)
+def _adp_source() -> ADPDataSource:
+    return ADPDataSource()
+
+@lru_cache(maxsize=1)
+def _nfl_db() -> NFLPlayerDatabase:
+    return NFLPlayerDatabase()
+
 class DatabaseCleaner:
     """Clean and enhance fantasy football player database"""
     
     def __init__(self):
-        self.validator = PlayerDataValidator()
-        self.adp_source = ADPDataSource()
-        self.nfl_db = NFLPlayerDatabase()
+        self.validator = _validator()
+        self.adp_source = _adp_source()
+        self.nfl_db = _nfl_db()
+        # Snapshot of the database contents shared by every stage of a run
+        self._players = None
+    
+    def _get_current_players(self) -> List[Dict]:
+        """Load players from the database once and reuse them across passes"""
+        if self._players is None:
+            self._players = get_all_players()
+        return self._players
     
     def clean_and_enhance_database(self, add_adp=True, refresh_nfl_data=False):
         """Main cleaning and enhancement process"""
@@ -31,36 +62,42 @@ class DatabaseCleaner:
         
         # Step 1: Get current players
         logger.info("Retrieving current players from database...")
-        current_players = get_all_players()
+        current_players = self._get_current_players()
         logger.info(f"Found {len(current_players)} players in database")
         
         if not current_players:
             logger.warning("No players found in database. Consider running populate_espn or populate_nfl first.")
             return
         
-        # Step 2: Validate and clean existing data
-        logger.info("Validating and cleaning player data...")
-        original_count = len(current_players)
-        
-        cleaned_players = self.validator.clean_database_players(current_players)
-        
-        # Generate validation report
-        report = self.validator.generate_validation_report(current_players, cleaned_players)
-        self._print_validation_report(report)
-        
-        # Step 3: Refresh with comprehensive NFL data if requested
-        if refresh_nfl_data:
-            logger.info("Refreshing with latest NFL player data...")
-            fresh_nfl_data = self._get_fresh_nfl_data()
-            if fresh_nfl_data:
-                # Merge with cleaned data, preferring NFL source for basic info
-                cleaned_players = self._merge_nfl_data(cleaned_players, fresh_nfl_data)
-                logger.info(f"Merged with {len(fresh_nfl_data)} NFL players")
-        
-        # Step 4: Add ADP data if requested
-        if add_adp:
-            logger.info("Adding ADP data from multiple sources...")
-            cleaned_players = self._add_adp_data(cleaned_players)
+        # The NFL refresh and ADP fetch are independent network-bound steps, so
+        # start them now and let them overlap with validation
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            nfl_future = executor.submit(self._get_fresh_nfl_data) if refresh_nfl_data else None
+            adp_future = executor.submit(self.adp_source.get_multi_format_adp) if add_adp else None
+            
+            # Step 2: Validate and clean existing data
+            logger.info("Validating and cleaning player data...")
+            original_count = len(current_players)
+            
+            cleaned_players = self.validator.clean_database_players(current_players)
+            
+            # Generate validation report
+            report = self.validator.generate_validation_report(current_players, cleaned_players)
+            self._print_validation_report(report)
+            
+            # Step 3: Refresh with comprehensive NFL data if requested
+            if nfl_future:
+                logger.info("Refreshing with latest NFL player data...")
+                fresh_nfl_data = nfl_future.result()
+                if fresh_nfl_data:
+                    # Merge with cleaned data, preferring NFL source for basic info
+                    cleaned_players = self._merge_nfl_data(cleaned_players, fresh_nfl_data)
+                    logger.info(f"Merged with {len(fresh_nfl_data)} NFL players")
+            
+            # Step 4: Add ADP data if requested
+            if adp_future:
+                logger.info("Adding ADP data from multiple sources...")
+                cleaned_players = self._add_adp_data(cleaned_players, adp_future)
         
         # Step 5: Final validation and statistics
         final_players = self._final_validation(cleaned_players)
@@ -82,25 +119,27 @@ class DatabaseCleaner:
         summary = report['summary']
         positions = report['positions']
         
-        print("\n" + "="*60)
-        print("DATA VALIDATION REPORT")
-        print("="*60)
+        lines = []
+        lines.append("\n" + "="*60)
+        lines.append("DATA VALIDATION REPORT")
+        lines.append("="*60)
         
-        print(f"Original players: {summary['original_count']}")
-        print(f"Valid players: {summary['cleaned_count']}")
-        print(f"Removed players: {summary['removed_count']} ({summary['removal_percentage']}%)")
+        lines.append(f"Original players: {summary['original_count']}")
+        lines.append(f"Valid players: {summary['cleaned_count']}")
+        lines.append(f"Removed players: {summary['removed_count']} ({summary['removal_percentage']}%)")
         
-        print("\nPLAYERS BY POSITION:")
-        print("-" * 30)
+        lines.append("\nPLAYERS BY POSITION:")
+        lines.append("-" * 30)
         all_positions = set(list(positions['original'].keys()) + list(positions['cleaned'].keys()))
         
         for pos in sorted(all_positions):
             orig = positions['original'].get(pos, 0)
             clean = positions['cleaned'].get(pos, 0)
             removed = orig - clean
-            print(f"{pos:8}: {orig:3} -> {clean:3} (removed: {removed})")
+            lines.append(f"{pos:8}: {orig:3} -> {clean:3} (removed: {removed})")
         
-        print("="*60)
+        lines.append("="*60)
+        sys.stdout.write('\n'.join(lines) + '\n')
     
     def _get_fresh_nfl_data(self) -> List[Dict]:
         """Get fresh NFL player data from Sleeper API"""
@@ -117,16 +156,13 @@ class DatabaseCleaner:
     def _merge_nfl_data(self, cleaned_players: List[Dict], nfl_data: List[Dict]) -> List[Dict]:
         """Merge cleaned players with fresh NFL data"""
         # Create lookup for NFL data
-        nfl_lookup = {}
-        for player in nfl_data:
-            key = f"{player['name'].lower()}_{player['position']}_{player.get('team', 'FA')}"
-            nfl_lookup[key] = player
+        nfl_lookup = {self._merge_key(player): player for player in nfl_data}
         
         merged_players = []
         
         # Update existing players with NFL data
         for player in cleaned_players:
-            key = f"{player['name'].lower()}_{player['position']}_{player.get('team', 'FA')}"
+            key = self._merge_key(player)
             
             if key in nfl_lookup:
                 # Merge with NFL data, preserving fantasy-specific fields
@@ -150,11 +186,27 @@ class DatabaseCleaner:
         
         return merged_players
     
-    def _add_adp_data(self, players: List[Dict]) -> List[Dict]:
-        """Add ADP data to players"""
+    @staticmethod
+    def _merge_key(player: Dict) -> tuple:
+        """Tuple key identifying a player across data sources"""
+        # Positions and teams come from small fixed vocabularies, so interning
+        # them lets key comparisons short-circuit on identity
+        position = player['position']
+        team = player.get('team', 'FA')
+        return (
+            player['name'].lower(),
+            sys.intern(position) if isinstance(position, str) else position,
+            sys.intern(team) if isinstance(team, str) else team,
+        )
+    
+    def _add_adp_data(self, players: List[Dict], adp_future: Optional[Future] = None) -> List[Dict]:
+        """Add ADP data to players, using an in-flight fetch when one is given"""
         try:
             # Get ADP data from multiple formats
-            multi_format_adp = self.adp_source.get_multi_format_adp()
+            if adp_future is not None:
+                multi_format_adp = adp_future.result()
+            else:
+                multi_format_adp = self.adp_source.get_multi_format_adp()
             
             if not multi_format_adp:
                 logger.warning("Could not retrieve ADP data")
@@ -165,7 +217,7 @@ class DatabaseCleaner:
             
             if consensus_adp:
                 # Merge ADP data with players
-                enhanced_players = self.adp_source.merge_adp_with_players(players, consensus_adp)
+                enhanced_players = self.adp_source.merge_adp_with_players(players, consensus_adp, in_place=True)
                 logger.info("ADP data successfully added to player database")
                 return enhanced_players
             else:
@@ -180,17 +232,17 @@ class DatabaseCleaner:
         """Final validation and quality check"""
         logger.info("Performing final validation...")
         
-        # Remove any players that still don't meet standards
-        valid_players = [p for p in players if self.validator.validate_player_data(p)]
+        # Remove any players that still don't meet standards; records stamped by
+        # clean_database_players were validated there, so only players added
+        # since (e.g. fresh NFL data) go through the validator again. The stamp
+        # is popped so it never reaches the database.
+        valid_players = [
+            p for p in players
+            if p.pop('_validated', False) or self.validator.validate_player_data(p)
+        ]
         
         # Sort by position and projected value
-        def sort_key(player):
-            position_order = {'QB': 1, 'RB': 2, 'WR': 3, 'TE': 4, 'K': 5, 'DEF': 6}
-            pos_priority = position_order.get(player.get('position', 'DEF'), 6)
-            adp = player.get('adp', 999)
-            return (pos_priority, adp)
-        
-        valid_players.sort(key=sort_key)
+        valid_players.sort(key=lambda p: (POSITION_ORDER.get(p.get('position', 'DEF'), 6), p.get('adp') or 999))
         
         logger.info(f"Final validation complete: {len(valid_players)} players ready")
         return valid_players
@@ -199,8 +251,10 @@ class DatabaseCleaner:
         """Backup current database and replace with cleaned data"""
         try:
             # For MongoDB, we'll use the upsert strategy from insert_players
-            # This will update existing players and add new ones
-            insert_players(new_players)
+            # This will update existing players and add new ones, sending
+            # the whole cleaned set in a handful of unordered bulk writes
+            insert_players(new_players, batch_size=REPLACE_BATCH_SIZE)
+            self._players = None
             logger.info("Database successfully updated with cleaned data")
             
         except Exception as e:
@@ -209,44 +263,43 @@ class DatabaseCleaner:
     
     def _print_final_summary(self, original_count: int, final_count: int):
         """Print final summary of cleaning process"""
-        print("\n" + "="*60)
-        print("CLEANING PROCESS COMPLETE")
-        print("="*60)
-        print(f"Original players: {original_count}")
-        print(f"Final players: {final_count}")
-        print(f"Improvement: {((original_count - final_count) / original_count * 100):.1f}% reduction")
-        print("Database has been updated with clean, validated player data.")
-        print("ADP data has been integrated where available.")
-        print("="*60)
+        lines = []
+        lines.append("\n" + "="*60)
+        lines.append("CLEANING PROCESS COMPLETE")
+        lines.append("="*60)
+        lines.append(f"Original players: {original_count}")
+        lines.append(f"Final players: {final_count}")
+        lines.append(f"Improvement: {((original_count - final_count) / original_count * 100):.1f}% reduction")
+        lines.append("Database has been updated with clean, validated player data.")
+        lines.append("ADP data has been integrated where available.")
+        lines.append("="*60)
+        sys.stdout.write('\n'.join(lines) + '\n')
     
     def quick_stats(self):
         """Print quick database statistics"""
-        players = get_all_players()
+        # Let the database group by position rather than transferring every document
+        stats = get_position_stats()
+        position_counts = Counter()
+        for pos, entry in stats.items():
+            position_counts['UNKNOWN' if pos is None else pos] += entry['count']
+        adp_count = sum(entry['with_adp'] for entry in stats.values())
         
-        if not players:
+        total = sum(position_counts.values())
+        if not total:
             print("No players found in database")
             return
         
-        # Count by position
-        position_counts = {}
-        adp_count = 0
-        
-        for player in players:
-            pos = player.get('position', 'UNKNOWN')
-            position_counts[pos] = position_counts.get(pos, 0) + 1
-            
-            if player.get('adp'):
-                adp_count += 1
-        
-        print("\n" + "="*40)
-        print("CURRENT DATABASE STATS")
-        print("="*40)
-        print(f"Total players: {len(players)}")
-        print(f"Players with ADP: {adp_count}")
-        print("\nBy position:")
+        lines = []
+        lines.append("\n" + "="*40)
+        lines.append("CURRENT DATABASE STATS")
+        lines.append("="*40)
+        lines.append(f"Total players: {total}")
+        lines.append(f"Players with ADP: {adp_count}")
+        lines.append("\nBy position:")
         for pos, count in sorted(position_counts.items()):
-            print(f"  {pos}: {count}")
-        print("="*40)
+            lines.append(f"  {pos}: {count}")
+        lines.append("="*40)
+        sys.stdout.write('\n'.join(lines) + '\n')
 
 def main():
     """Main execution function"""
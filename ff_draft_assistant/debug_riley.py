@@ -5,8 +5,17 @@ Debug Riley Neal issue
 
 from mongo_utils import get_all_players
 from player_search import PlayerSearchEngine
+import re
 import sys
 
+# Names containing both 'riley' and 'neal', in either order, matched without
+# building a lowercased copy of every name
+RILEY_NEAL = re.compile(r'riley.*neal|neal.*riley', re.IGNORECASE)
+
+def is_riley_neal(name):
+    """Return True if the name contains both 'riley' and 'neal'"""
+    return RILEY_NEAL.search(str(name)) is not None
+
 def debug_riley_neal():
     print("DEBUGGING RILEY NEAL ISSUE")
     print("=" * 50)
@@ -17,11 +26,7 @@ def debug_riley_neal():
     print(f"   Total players in database: {len(players)}")
     
     # Search for Riley Neal in raw data
-    riley_in_db = []
-    for player in players:
-        name = str(player.get('name', ''))
-        if 'riley' in name.lower() and 'neal' in name.lower():
-            riley_in_db.append(player)
+    riley_in_db = [p for p in players if is_riley_neal(p.get('name', ''))]
     
     print(f"   Riley Neal found in database: {len(riley_in_db)}")
     for player in riley_in_db:
@@ -42,11 +47,7 @@ def debug_riley_neal():
     print(f"   Cache size after refresh: {cache_size_after}")
     
     # Search for Riley Neal in cache
-    riley_in_cache = []
-    for player in search_engine.players_cache:
-        name = str(player.get('name', ''))
-        if 'riley' in name.lower() and 'neal' in name.lower():
-            riley_in_cache.append(player)
+    riley_in_cache = [p for p in search_engine.players_cache if is_riley_neal(p.get('name', ''))]
     
     print(f"   Riley Neal found in cache: {len(riley_in_cache)}")
     for player in riley_in_cache:
@@ -57,8 +58,7 @@ def debug_riley_neal():
     search_results = search_engine.search_players(query="Riley Neal", max_results=10)
     print(f"   Search results for 'Riley Neal': {len(search_results)}")
     for player in search_results:
-        name = player.get('name', '')
-        if 'riley' in name.lower() and 'neal' in name.lower():
+        if is_riley_neal(player.get('name', '')):
             print(f"     *** FOUND: {player.get('name')} ({player.get('position')} - {player.get('team')})")
         else:
             print(f"     - {player.get('name')} ({player.get('position')} - {player.get('team')})")
@@ -66,11 +66,7 @@ def debug_riley_neal():
     # Step 5: Test general search that might include Riley Neal
     print("\n5. Testing general search (first 20 players)...")
     all_results = search_engine.search_players(query="", max_results=20)
-    riley_in_search = []
-    for player in all_results:
-        name = str(player.get('name', ''))
-        if 'riley' in name.lower() and 'neal' in name.lower():
-            riley_in_search.append(player)
+    riley_in_search = [p for p in all_results if is_riley_neal(p.get('name', ''))]
     
     print(f"   Riley Neal in first 20 search results: {len(riley_in_search)}")
     for player in riley_in_search:
@@ -1,14 +1,20 @@
+import time
+
 from .pdf_parser import PDFPlayerSheet
 from .sleeper_api import SleeperAPI
 from .espn_http_api import ESPNAPI
 
+# Seconds a combined ESPN league/draft response is reused before refetching
+ESPN_CACHE_TTL = 60
+
 class DraftAssistant:
     def __init__(self, pdf_path: str, json_path: str):
         self.sheet = PDFPlayerSheet(pdf_path)
         self.json_path = json_path
+        self._espn_cache = {}
+        # parse_pdf already populates the sheet; save only persists it
         self.sheet.parse_pdf()
         self.sheet.save(json_path)
-        self.sheet.load(json_path)
 
     def mark_player_drafted(self, player_name: str):
         self.sheet.mark_drafted(player_name)
@@ -24,11 +30,23 @@ class DraftAssistant:
         # ...process ADP...
         return players
 
+    def _get_espn_league_and_draft(self, league_id: str, season: int | None = None):
+        """Return the combined ESPN league/draft document, cached for ESPN_CACHE_TTL"""
+        key = (league_id, season)
+        cached = self._espn_cache.get(key)
+        now = time.monotonic()
+        if cached and cached[0] > now:
+            return cached[1]
+
+        data = ESPNAPI.get_league_and_draft(league_id, season)
+        self._espn_cache[key] = (now + ESPN_CACHE_TTL, data)
+        return data
+
     def get_espn_league(self, league_id: str, season: int | None = None):
-        return ESPNAPI.get_league(league_id, season)
+        return self._get_espn_league_and_draft(league_id, season)
 
     def get_espn_draft(self, league_id: str, season: int | None = None):
-        return ESPNAPI.get_draft(league_id, season)
+        return self._get_espn_league_and_draft(league_id, season)
 
 # Example usage:
 # assistant = DraftAssistant('Top_300_Full_PPR.pdf', 'parsed_players.json')
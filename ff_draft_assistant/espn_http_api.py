@@ -3,6 +3,37 @@ from datetime import datetime
 from typing import Dict, Any
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib codec
+    orjson = None
+
+# Shared keep-alive session so repeated polls during a draft reuse the
+# same TCP/TLS connection and transparently retry throttled/5xx responses
+_SESSION = requests.Session()
+_SESSION.mount(
+    'https://',
+    HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=Retry(total=3, backoff_factor=0.3,
+                          status_forcelist=[429, 500, 502, 503, 504]),
+    ),
+)
+_SESSION.headers.update({'Accept-Encoding': 'gzip', 'User-Agent': 'ff-draft-assistant/1.0'})
+
+# (connect, read) timeouts in seconds
+_TIMEOUT = (3, 10)
+
+
+def _decode(response: requests.Response) -> Dict[str, Any]:
+    """Decode a JSON response body, straight from bytes when orjson is available."""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
 
 class ESPNAPI:
     @staticmethod
@@ -17,18 +48,30 @@ class ESPNAPI:
         season = season or datetime.now().year
         url = f"{ESPNAPI._base_url(season)}/{league_id}"
 
-        response = requests.get(url)
+        response = _SESSION.get(url, timeout=_TIMEOUT)
         response.raise_for_status()
-        return response.json()
+        return _decode(response)
 
     @staticmethod
     def get_draft(league_id: str, season: int | None = None) -> Dict[str, Any]:
         season = season or datetime.now().year
         url = f"{ESPNAPI._base_url(season)}/{league_id}?view=mDraftDetail"
-        response = requests.get(url)
+        response = _SESSION.get(url, timeout=_TIMEOUT)
+        response.raise_for_status()
+        return _decode(response)
+
+    @staticmethod
+    def get_league_and_draft(league_id: str, season: int | None = None) -> Dict[str, Any]:
+        """Fetch team, roster and draft views of a league in a single request."""
+        season = season or datetime.now().year
+        url = f"{ESPNAPI._base_url(season)}/{league_id}"
+        # Repeated view params are sent as ?view=mTeam&view=mRoster&view=mDraftDetail
+        params = [('view', 'mTeam'), ('view', 'mRoster'), ('view', 'mDraftDetail')]
+        response = _SESSION.get(url, params=params, timeout=_TIMEOUT)
         response.raise_for_status()
-        return response.json()
+        return _decode(response)
 
 # Example usage:
 # league = ESPNAPI.get_league('your_league_id')
 # draft = ESPNAPI.get_draft('your_league_id')
+# both = ESPNAPI.get_league_and_draft('your_league_id')
@@ -4,36 +4,105 @@ Fresh database loader - Clear and reload with high-quality NFL player data
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import logging
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import List, Dict, Optional
-from mongo_utils import insert_players, get_all_players
+from mongo_utils import insert_players, get_all_players, is_mongodb_available
 from adp_integration import ADPDataSource
-from local_store import LocalDataStore
+from local_store import local_store as shared_local_store
 import json
 import os
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib codec
+    orjson = None
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+NFL_TEAMS = frozenset({
+    'ARI', 'ATL', 'BAL', 'BUF', 'CAR', 'CHI', 'CIN', 'CLE',
+    'DAL', 'DEN', 'DET', 'GB', 'HOU', 'IND', 'JAX', 'KC',
+    'LV', 'LAC', 'LAR', 'MIA', 'MIN', 'NE', 'NO', 'NYG',
+    'NYJ', 'PHI', 'PIT', 'SF', 'SEA', 'TB', 'TEN', 'WAS'
+})
+
+FANTASY_POSITIONS = frozenset({'QB', 'RB', 'WR', 'TE', 'K', 'DEF'})
+
+INACTIVE_STATUSES = frozenset({'RETIRED', 'SUSPENDED', 'INACTIVE'})
+
+# (Sleeper stat key, player field) pairs copied onto every player
+COMMON_STATS = (
+    ('gp', 'games_played'),
+    ('pts_ppr', 'fantasy_points_ppr'),
+    ('pts_std', 'fantasy_points_std'),
+    ('pts_half_ppr', 'fantasy_points_half_ppr'),
+)
+
+_RECEIVING_STATS = (
+    ('rec', 'receptions'),
+    ('rec_yd', 'receiving_yards'),
+    ('rec_td', 'receiving_touchdowns'),
+    ('rush_yd', 'rushing_yards'),
+    ('rush_td', 'rushing_touchdowns'),
+)
+
+# Position-specific stat pairs, looked up once per player
+STATS_BY_POSITION = {
+    'QB': (
+        ('pass_yd', 'passing_yards'),
+        ('pass_td', 'passing_touchdowns'),
+        ('pass_int', 'interceptions'),
+        ('rush_yd', 'rushing_yards'),
+        ('rush_td', 'rushing_touchdowns'),
+    ),
+    'RB': (
+        ('rush_yd', 'rushing_yards'),
+        ('rush_td', 'rushing_touchdowns'),
+        ('rec', 'receptions'),
+        ('rec_yd', 'receiving_yards'),
+        ('rec_td', 'receiving_touchdowns'),
+    ),
+    'WR': _RECEIVING_STATS,
+    'TE': _RECEIVING_STATS,
+    'K': (
+        ('fgm', 'field_goals_made'),
+        ('fga', 'field_goals_attempted'),
+        ('xpm', 'extra_points_made'),
+        ('xpa', 'extra_points_attempted'),
+    ),
+}
+
+POSITION_PRIORITY = {'QB': 1, 'RB': 2, 'WR': 3, 'TE': 4, 'K': 5, 'DEF': 6}
+
 class FreshDatabaseLoader:
     """Load fresh, high-quality NFL player data from multiple sources"""
     
     def __init__(self):
         self.sleeper_url = "https://api.sleeper.app/v1/players/nfl"
-        self.adp_source = ADPDataSource()
-        self.local_store = LocalDataStore()
+        
+        # One pooled session shared by the Sleeper and ADP requests
+        self.session = requests.Session()
+        retries = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+        self.session.mount('https://', HTTPAdapter(pool_connections=8, pool_maxsize=16, max_retries=retries))
+        self.session.headers.update({
+            'Accept-Encoding': 'gzip',
+            'User-Agent': 'ff-draft-assistant/1.0'
+        })
+        
+        self.adp_source = ADPDataSource(session=self.session)
+        self.local_store = shared_local_store
         
         # NFL teams for validation
-        self.nfl_teams = {
-            'ARI', 'ATL', 'BAL', 'BUF', 'CAR', 'CHI', 'CIN', 'CLE',
-            'DAL', 'DEN', 'DET', 'GB', 'HOU', 'IND', 'JAX', 'KC',
-            'LV', 'LAC', 'LAR', 'MIA', 'MIN', 'NE', 'NO', 'NYG',
-            'NYJ', 'PHI', 'PIT', 'SF', 'SEA', 'TB', 'TEN', 'WAS'
-        }
+        self.nfl_teams = NFL_TEAMS
         
         # Fantasy relevant positions
-        self.fantasy_positions = {'QB', 'RB', 'WR', 'TE', 'K', 'DEF'}
+        self.fantasy_positions = FANTASY_POSITIONS
         
         # Minimum thresholds for player inclusion
         self.min_thresholds = {
@@ -45,6 +114,12 @@ class FreshDatabaseLoader:
             'DEF': {'years_exp': 0, 'depth_chart_order': 1}  # 1 DEF per team
         }
     
+        # Per-position depth chart cutoffs, flattened for the processing loop
+        self.depth_limits = {pos: limits['depth_chart_order'] for pos, limits in self.min_thresholds.items()}
+        
+        # Timestamp stamped on players extracted during the current load
+        self._load_timestamp = None
+    
     def clear_database(self):
         """Clear existing database"""
         logger.info("Clearing existing database...")
@@ -62,29 +137,46 @@ class FreshDatabaseLoader:
         logger.info("Loading fresh NFL player data from Sleeper API...")
         
         try:
-            # Step 1: Fetch from Sleeper API
-            response = requests.get(self.sleeper_url, timeout=30)
-            response.raise_for_status()
-            sleeper_data = response.json()
-            
-            logger.info(f"Retrieved {len(sleeper_data)} players from Sleeper API")
-            
-            # Step 2: Process and filter players
-            processed_players = self._process_sleeper_data(sleeper_data)
-            
-            # Step 3: Add ADP data
-            players_with_adp = self._add_adp_data(processed_players)
+            # The Sleeper dump and the ADP feeds are independent downloads, so
+            # fetch ADP in the background while Sleeper data is loaded and processed
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                adp_future = executor.submit(self.adp_source.get_multi_format_adp)
+                
+                # Step 1: Fetch from Sleeper API
+                response = self.session.get(self.sleeper_url, timeout=30)
+                response.raise_for_status()
+                # orjson decodes the multi-MB body straight from bytes
+                sleeper_data = orjson.loads(response.content) if orjson else response.json()
+                del response
+                raw_count = len(sleeper_data)
+                
+                logger.info(f"Retrieved {raw_count} players from Sleeper API")
+                
+                # Step 2: Process and filter players
+                processed_players = self._process_sleeper_data(sleeper_data)
+                
+                # Only a few hundred survivors are needed from here on; release
+                # the ~11k raw records before the ADP merge and database write
+                del sleeper_data
+                
+                # Step 3: Add ADP data
+                players_with_adp = self._add_adp_data(processed_players, adp_future)
             
             # Step 4: Final quality check
             final_players = self._final_quality_check(players_with_adp)
             
-            # Step 5: Save to database
-            insert_players(final_players)
+            # Step 5: Save to database. Without MongoDB this is a fresh load into
+            # the local store, so write the vetted roster once instead of
+            # merging it player by player
+            if is_mongodb_available():
+                insert_players(final_players)
+            else:
+                self.local_store.bulk_replace(final_players)
             
             logger.info(f"Successfully loaded {len(final_players)} high-quality players")
             
             # Generate summary report
-            report = self._generate_load_report(sleeper_data, final_players)
+            report = self._generate_load_report(raw_count, final_players)
             
             return report
             
@@ -95,12 +187,25 @@ class FreshDatabaseLoader:
     def _process_sleeper_data(self, sleeper_data: Dict) -> List[Dict]:
         """Process raw Sleeper data into clean player records"""
         processed_players = []
-        position_counts = {}
-        
-        for player_id, player_info in sleeper_data.items():
-            if not isinstance(player_info, dict):
-                continue
-            
+        position_counts = Counter()
+        depth_limits = self.depth_limits
+        
+        # Every record from this load shares one last_updated stamp
+        self._load_timestamp = datetime.now().isoformat()
+        
+        # Most of the Sleeper dump is free agents and non-fantasy positions;
+        # drop those in one comprehension before any per-player extraction
+        fantasy_positions = self.fantasy_positions
+        nfl_teams = self.nfl_teams
+        candidates = [
+            (player_id, player_info)
+            for player_id, player_info in sleeper_data.items()
+            if isinstance(player_info, dict)
+            and player_info.get('position') in fantasy_positions
+            and player_info.get('team') in nfl_teams
+        ]
+        
+        for player_id, player_info in candidates:
             # Extract basic info
             player = self._extract_player_info(player_id, player_info)
             
@@ -114,15 +219,14 @@ class FreshDatabaseLoader:
             # Track position counts for depth chart management
             pos = player['position']
             team = player['team']
-            position_key = f"{team}_{pos}"
-            position_counts[position_key] = position_counts.get(position_key, 0) + 1
+            position_key = (team, pos)
+            position_counts[position_key] += 1
             
             # Apply depth chart limits
-            max_depth = self.min_thresholds.get(pos, {}).get('depth_chart_order', 10)
-            if position_counts[position_key] <= max_depth:
+            if position_counts[position_key] <= depth_limits.get(pos, 10):
                 processed_players.append(player)
             else:
-                logger.debug(f"Skipping {player['name']} - depth chart limit reached for {pos} on {team}")
+                logger.debug("Skipping %s - depth chart limit reached for %s on %s", player['name'], pos, team)
         
         logger.info(f"Processed {len(processed_players)} players from Sleeper data")
         return processed_players
@@ -130,30 +234,32 @@ class FreshDatabaseLoader:
     def _extract_player_info(self, player_id: str, player_info: Dict) -> Optional[Dict]:
         """Extract and clean player information"""
         try:
+            get = player_info.get
+            
             # Basic required fields
-            position = player_info.get('position')
-            team = player_info.get('team')
+            position = get('position')
+            team = get('team')
             
             # Must have valid position and team
-            if not position or not team or position not in self.fantasy_positions:
+            if not position or not team or position not in FANTASY_POSITIONS:
                 return None
             
-            if team not in self.nfl_teams:
+            if team not in NFL_TEAMS:
                 return None
             
             # Player name
-            full_name = player_info.get('full_name')
+            full_name = get('full_name')
             if not full_name:
-                first = player_info.get('first_name', '')
-                last = player_info.get('last_name', '')
+                first = get('first_name', '')
+                last = get('last_name', '')
                 full_name = f"{first} {last}".strip()
             
             if not full_name or len(full_name) < 2:
                 return None
             
             # Status check - must be active
-            status = player_info.get('status', '').upper()
-            if status in ['RETIRED', 'SUSPENDED', 'INACTIVE']:
+            status = get('status', '').upper()
+            if status in INACTIVE_STATUSES:
                 return None
             
             # Build player record
@@ -163,15 +269,15 @@ class FreshDatabaseLoader:
                 'position': position,
                 'team': team,
                 'status': status or 'Active',
-                'years_exp': player_info.get('years_exp', 0),
-                'age': player_info.get('age'),
-                'height': player_info.get('height'),
-                'weight': player_info.get('weight'),
-                'college': player_info.get('college'),
-                'jersey_number': player_info.get('number'),
+                'years_exp': get('years_exp', 0),
+                'age': get('age'),
+                'height': get('height'),
+                'weight': get('weight'),
+                'college': get('college'),
+                'jersey_number': get('number'),
                 'drafted': False,  # Default to not drafted
                 'source': 'sleeper_api',
-                'last_updated': datetime.now().isoformat()
+                'last_updated': self._load_timestamp
             }
             
             # Add position-specific stats if available
@@ -180,75 +286,17 @@ class FreshDatabaseLoader:
             return player
             
         except Exception as e:
-            logger.debug(f"Error processing player {player_id}: {e}")
+            logger.debug("Error processing player %s: %s", player_id, e)
             return None
     
     def _add_position_stats(self, player: Dict, player_info: Dict):
         """Add position-specific statistics"""
-        position = player['position']
-        
-        # Common stats
-        stats_mapping = {
-            'gp': 'games_played',
-            'pts_ppr': 'fantasy_points_ppr',
-            'pts_std': 'fantasy_points_std',
-            'pts_half_ppr': 'fantasy_points_half_ppr'
-        }
+        get = player_info.get
         
-        for sleeper_key, player_key in stats_mapping.items():
-            value = player_info.get(sleeper_key)
-            if value is not None and value > 0:
-                player[player_key] = value
-        
-        # Position specific stats
-        if position == 'QB':
-            qb_stats = {
-                'pass_yd': 'passing_yards',
-                'pass_td': 'passing_touchdowns',
-                'pass_int': 'interceptions',
-                'rush_yd': 'rushing_yards',
-                'rush_td': 'rushing_touchdowns'
-            }
-            for sleeper_key, player_key in qb_stats.items():
-                value = player_info.get(sleeper_key)
-                if value is not None and value > 0:
-                    player[player_key] = value
-                    
-        elif position == 'RB':
-            rb_stats = {
-                'rush_yd': 'rushing_yards',
-                'rush_td': 'rushing_touchdowns', 
-                'rec': 'receptions',
-                'rec_yd': 'receiving_yards',
-                'rec_td': 'receiving_touchdowns'
-            }
-            for sleeper_key, player_key in rb_stats.items():
-                value = player_info.get(sleeper_key)
-                if value is not None and value > 0:
-                    player[player_key] = value
-                    
-        elif position in ['WR', 'TE']:
-            rec_stats = {
-                'rec': 'receptions',
-                'rec_yd': 'receiving_yards',
-                'rec_td': 'receiving_touchdowns',
-                'rush_yd': 'rushing_yards',
-                'rush_td': 'rushing_touchdowns'
-            }
-            for sleeper_key, player_key in rec_stats.items():
-                value = player_info.get(sleeper_key)
-                if value is not None and value > 0:
-                    player[player_key] = value
-                    
-        elif position == 'K':
-            k_stats = {
-                'fgm': 'field_goals_made',
-                'fga': 'field_goals_attempted',
-                'xpm': 'extra_points_made',
-                'xpa': 'extra_points_attempted'
-            }
-            for sleeper_key, player_key in k_stats.items():
-                value = player_info.get(sleeper_key)
+        # Common stats, then the position's own stats
+        for stats in (COMMON_STATS, STATS_BY_POSITION.get(player['position'], ())):
+            for sleeper_key, player_key in stats:
+                value = get(sleeper_key)
                 if value is not None and value > 0:
                     player[player_key] = value
     
@@ -262,7 +310,7 @@ class FreshDatabaseLoader:
         # Age filter - reasonable NFL age range
         age = player.get('age')
         if age and (age < 20 or age > 40):
-            logger.debug(f"Age filter: {player['name']} age {age}")
+            logger.debug("Age filter: %s age %s", player['name'], age)
             return False
         
         # Experience filter - include rookies but be selective
@@ -274,27 +322,30 @@ class FreshDatabaseLoader:
             has_college = bool(player.get('college'))
             
             if not (has_stats or has_college):
-                logger.debug(f"Rookie filter: {player['name']} - no stats or college info")
+                logger.debug("Rookie filter: %s - no stats or college info", player['name'])
                 return False
         
         # Very high experience might indicate old/inactive players
         if years_exp > 20:
-            logger.debug(f"Experience filter: {player['name']} - {years_exp} years experience")
+            logger.debug("Experience filter: %s - %s years experience", player['name'], years_exp)
             return False
         
         return True
     
-    def _add_adp_data(self, players: List[Dict]) -> List[Dict]:
-        """Add ADP data to players"""
+    def _add_adp_data(self, players: List[Dict], adp_future: Optional[Future] = None) -> List[Dict]:
+        """Add ADP data to players, using an in-flight fetch when one is given"""
         logger.info("Adding ADP data...")
         
         try:
             # Get consensus ADP data
-            multi_format_adp = self.adp_source.get_multi_format_adp()
+            if adp_future is not None:
+                multi_format_adp = adp_future.result()
+            else:
+                multi_format_adp = self.adp_source.get_multi_format_adp()
             
             if multi_format_adp:
                 consensus_adp = self.adp_source.calculate_consensus_adp(multi_format_adp)
-                players_with_adp = self.adp_source.merge_adp_with_players(players, consensus_adp)
+                players_with_adp = self.adp_source.merge_adp_with_players(players, consensus_adp, in_place=True)
                 logger.info(f"Successfully added ADP data")
                 return players_with_adp
             else:
@@ -357,11 +408,10 @@ class FreshDatabaseLoader:
     def _fantasy_sort_key(self, player: Dict):
         """Sort key for fantasy relevance"""
         # Position priority
-        position_priority = {'QB': 1, 'RB': 2, 'WR': 3, 'TE': 4, 'K': 5, 'DEF': 6}
-        pos_score = position_priority.get(player.get('position', 'DEF'), 6)
+        pos_score = POSITION_PRIORITY.get(player.get('position', 'DEF'), 6)
         
         # ADP score (lower ADP = higher priority)
-        adp_score = player.get('adp', 999)
+        adp_score = player.get('adp') or 999
         
         # Fantasy points score
         fantasy_score = -(player.get('fantasy_points_ppr', 0))  # Negative for desc order
@@ -370,24 +420,25 @@ class FreshDatabaseLoader:
     
     def _add_position_rankings(self, players: List[Dict]):
         """Add position-specific rankings"""
-        position_counters = {}
+        position_counters = Counter()
         
         for player in players:
             position = player.get('position', 'DEF')
-            position_counters[position] = position_counters.get(position, 0) + 1
+            position_counters[position] += 1
             player['position_rank'] = position_counters[position]
     
-    def _generate_load_report(self, raw_data: Dict, final_players: List[Dict]) -> Dict:
+    def _generate_load_report(self, raw_count: int, final_players: List[Dict]) -> Dict:
         """Generate comprehensive load report"""
         
-        # Position breakdown
-        position_counts = {}
+        # Position and team breakdown in a single pass
+        position_counts = Counter()
+        team_counts = Counter()
         adp_count = 0
         stats_count = 0
         
         for player in final_players:
-            pos = player.get('position', 'Unknown')
-            position_counts[pos] = position_counts.get(pos, 0) + 1
+            position_counts[player.get('position', 'Unknown')] += 1
+            team_counts[player.get('team', 'Unknown')] += 1
             
             if player.get('adp'):
                 adp_count += 1
@@ -395,21 +446,15 @@ class FreshDatabaseLoader:
             if player.get('fantasy_points_ppr', 0) > 0:
                 stats_count += 1
         
-        # Team breakdown
-        team_counts = {}
-        for player in final_players:
-            team = player.get('team', 'Unknown')
-            team_counts[team] = team_counts.get(team, 0) + 1
-        
         return {
             'load_summary': {
-                'raw_sleeper_players': len(raw_data),
+                'raw_sleeper_players': raw_count,
                 'final_loaded_players': len(final_players),
-                'data_quality_rate': f"{len(final_players) / len(raw_data) * 100:.1f}%",
+                'data_quality_rate': f"{len(final_players) / raw_count * 100:.1f}%",
                 'players_with_adp': adp_count,
                 'players_with_stats': stats_count
             },
-            'position_breakdown': position_counts,
+            'position_breakdown': dict(position_counts),
             'team_breakdown': dict(sorted(team_counts.items())),
             'load_timestamp': datetime.now().isoformat()
         }
@@ -1,21 +1,45 @@
+import atexit
 import json
 import os
+import threading
 from typing import List, Dict
 import logging
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib codec
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# Seconds to coalesce drafted-status updates before rewriting the file
+FLUSH_DELAY = 1.0
+
 class LocalDataStore:
     """Fallback local JSON data store when MongoDB is unavailable."""
     
     def __init__(self, file_path: str = "local_players.json"):
         self.file_path = file_path
         self.data = self._load_data()
+        # Lazily built name -> position in self.data for drafted-status updates
+        self._name_index = None
+        # Lazily built per-field inverted indices: field -> value -> positions.
+        # Records are copied in and out, so only the methods below mutate them
+        # and each one invalidates the indices it affects.
+        self._field_index = {}
+        
+        # Unsaved changes and the pending timer that will write them out
+        self._dirty = False
+        self._flush_timer = None
+        self._flush_lock = threading.Lock()
     
     def _load_data(self) -> List[Dict]:
         """Load data from JSON file."""
         if os.path.exists(self.file_path):
             try:
+                if orjson is not None:
+                    with open(self.file_path, 'rb') as f:
+                        return orjson.loads(f.read())
                 with open(self.file_path, 'r') as f:
                     return json.load(f)
             except Exception as e:
@@ -25,66 +49,146 @@ class LocalDataStore:
     
     def _save_data(self):
         """Save data to JSON file."""
+        # Write to a temporary file and swap it in so readers never see a torn file
+        tmp_path = self.file_path + '.tmp'
         try:
-            with open(self.file_path, 'w') as f:
-                json.dump(self.data, f, indent=2)
+            if orjson is not None:
+                with open(tmp_path, 'wb') as f:
+                    f.write(orjson.dumps(self.data, option=orjson.OPT_INDENT_2))
+            else:
+                with open(tmp_path, 'w') as f:
+                    json.dump(self.data, f, indent=2)
+            os.replace(tmp_path, self.file_path)
         except Exception as e:
             logger.error(f"Failed to save local data: {e}")
     
+    def _schedule_flush(self):
+        """Mark data as changed and write it out after FLUSH_DELAY seconds."""
+        with self._flush_lock:
+            self._dirty = True
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(FLUSH_DELAY, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+    
+    def flush(self):
+        """Write any pending changes to disk now.
+        
+        The shared ``local_store`` instance is flushed at interpreter exit;
+        other instances must call this before they are discarded.
+        """
+        with self._flush_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._dirty:
+                return
+            self._dirty = False
+            self._save_data()
+    
     def insert_players(self, players: List[Dict]):
         """Insert or update players in local store."""
+        # Index existing players by name and position; the first match wins
+        index = {}
+        for i, existing_player in enumerate(self.data):
+            index.setdefault((existing_player.get('name'), existing_player.get('position')), i)
+        
         for new_player in players:
-            # Find existing player by name and position
-            existing_index = None
-            for i, existing_player in enumerate(self.data):
-                if (existing_player.get('name') == new_player.get('name') and 
-                    existing_player.get('position') == new_player.get('position')):
-                    existing_index = i
-                    break
+            key = (new_player.get('name'), new_player.get('position'))
+            existing_index = index.get(key)
             
             if existing_index is not None:
                 # Update existing player
                 self.data[existing_index].update(new_player)
             else:
                 # Add new player
-                self.data.append(new_player)
+                index[key] = len(self.data)
+                self.data.append(dict(new_player))
         
-        self._save_data()
+        self._invalidate_indices()
+        self._dirty = True
+        self.flush()
         logger.info(f"Saved {len(players)} players to local store")
     
+    def bulk_replace(self, players: List[Dict]):
+        """Replace the whole store with players in a single write."""
+        self.data = [dict(player) for player in players]
+        self._invalidate_indices()
+        self._dirty = True
+        self.flush()
+        logger.info(f"Replaced local store with {len(self.data)} players")
+    
     def get_all_players(self) -> List[Dict]:
         """Get all players from local store."""
-        return self.data.copy()
+        return [dict(player) for player in self.data]
+    
+    def _invalidate_indices(self):
+        """Drop lookup indices after the stored players change."""
+        self._name_index = None
+        self._field_index = {}
+    
+    def _get_field_index(self, field: str) -> Dict:
+        """Map each value of a field to the positions of players holding it."""
+        index = self._field_index.get(field)
+        if index is None:
+            index = {}
+            for i, player in enumerate(self.data):
+                value = player.get(field)
+                try:
+                    index.setdefault(value, []).append(i)
+                except TypeError:
+                    # Unhashable values (lists, dicts) never equal a hashable query value
+                    continue
+            self._field_index[field] = index
+        return index
     
     def search_players(self, query: Dict) -> List[Dict]:
         """Search players in local store."""
-        results = []
-        for player in self.data:
-            match = True
+        try:
+            candidates = None
             for key, value in query.items():
-                if player.get(key) != value:
-                    match = False
-                    break
-            if match:
-                results.append(player)
-        return results
+                positions = self._get_field_index(key).get(value, ())
+                candidates = set(positions) if candidates is None else candidates.intersection(positions)
+                if not candidates:
+                    return []
+        except TypeError:
+            # Unhashable query value; fall back to a linear scan
+            return [
+                dict(player) for player in self.data
+                if all(player.get(key) == value for key, value in query.items())
+            ]
+        
+        if candidates is None:
+            return self.get_all_players()
+        return [dict(self.data[i]) for i in sorted(candidates)]
     
     def update_player_drafted_status(self, player_name: str, drafted: bool) -> bool:
         """Update a player's drafted status in local store."""
-        for player in self.data:
-            if player.get('name') == player_name:
-                player['drafted'] = drafted
-                self._save_data()
-                logger.info(f"Updated {player_name} drafted status to {drafted}")
-                return True
+        if self._name_index is None:
+            self._name_index = {}
+            for i, player in enumerate(self.data):
+                self._name_index.setdefault(player.get('name'), i)
+        
+        i = self._name_index.get(player_name)
+        if i is not None:
+            self.data[i]['drafted'] = drafted
+            self._field_index.pop('drafted', None)
+            # Picks arrive in bursts during a draft; coalesce them into one write
+            self._schedule_flush()
+            logger.info(f"Updated {player_name} drafted status to {drafted}")
+            return True
         logger.warning(f"Player {player_name} not found in local store")
         return False
     
     def clear_all_data(self):
         """Clear all data from local store."""
         self.data = []
-        self._save_data()
+        self._invalidate_indices()
+        self._dirty = True
+        self.flush()
         logger.info("Cleared all data from local store")
 
-# Global fallback instance
+# Global fallback instance; use it rather than opening the same file twice,
+# since each instance would overwrite the other's writes
 local_store = LocalDataStore()
+atexit.register(local_store.flush)
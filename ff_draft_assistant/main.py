@@ -1,18 +1,41 @@
 
+import json
 import os
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib codec
+    orjson = None
+
 from .pdf_parser import PDFPlayerSheet
-from .openai_parser import parse_table_with_openai
+from .openai_parser import parse_tables_batch
 import pdfplumber
-from .mongo_utils import insert_players, search_players, get_all_players
+from .mongo_utils import DEFAULT_PROJECTION, insert_players, search_players, get_all_players
+
+# Lines of PDF text sent to OpenAI per parse request
+OPENAI_BLOCK_LINES = 60
+
+# Extracted PDF text is cached here, keyed by file name and modification time
+PDF_TEXT_CACHE_DIR = os.path.join(os.path.dirname(__file__), '.cache')
 
 def extract_pdf_text(pdf_path):
-    text = ""
+    mtime = int(os.stat(pdf_path).st_mtime)
+    cache_path = os.path.join(PDF_TEXT_CACHE_DIR, f"{os.path.basename(pdf_path)}.{mtime}.txt")
+    if os.path.exists(cache_path):
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    pages = []
     with pdfplumber.open(pdf_path) as pdf:
         for page in pdf.pages:
             page_text = page.extract_text()
             if page_text:
-                text += page_text + "\n"
+                pages.append(page_text + "\n")
+    text = "".join(pages)
+
+    os.makedirs(PDF_TEXT_CACHE_DIR, exist_ok=True)
+    with open(cache_path, 'w', encoding='utf-8') as f:
+        f.write(text)
     return text
 
 def main():
@@ -27,22 +50,29 @@ def main():
         print("Parsing PDF with OpenAI for column/table extraction...")
         text = extract_pdf_text(pdf_path)
         try:
-            player_dicts = parse_table_with_openai(text, columns)
+            # Parse the rankings in blocks: one response can't hold all 300 rows,
+            # and the blocks are sent to OpenAI concurrently
+            lines = text.splitlines()
+            blocks = ["\n".join(lines[i:i + OPENAI_BLOCK_LINES]) for i in range(0, len(lines), OPENAI_BLOCK_LINES)]
+            player_dicts = [row for rows in parse_tables_batch(blocks, columns) for row in rows]
             # Save as JSON
-            import json
-            with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump(player_dicts, f, indent=2)
+            if orjson is not None:
+                with open(json_path, 'wb') as f:
+                    f.write(orjson.dumps(player_dicts, option=orjson.OPT_INDENT_2))
+            else:
+                with open(json_path, 'w', encoding='utf-8') as f:
+                    json.dump(player_dicts, f, indent=2)
             print(f"Parsed player data saved to {json_path}")
             # Insert into MongoDB
             insert_players(player_dicts)
             print("Inserted player data into MongoDB.")
             # Print first 10 players from MongoDB
-            all_players = get_all_players()
+            all_players = get_all_players(DEFAULT_PROJECTION)
             print("First 10 players from MongoDB:")
             for p in all_players[:10]:
                 print(f"{p['rank']}. {p['name']} {p['position']} {p['team']}")
             # Example search: all RBs
-            rbs = search_players({"position": "RB"})
+            rbs = search_players({"position": "RB"}, DEFAULT_PROJECTION)
             print(f"\nFound {len(rbs)} RBs. Example: {rbs[:3]}")
         except Exception as e:
             print(f"OpenAI parsing failed: {e}")
@@ -4,6 +4,7 @@ Manual validation script to identify and remove non-NFL players
 """
 
 import logging
+from collections import Counter
 from typing import List, Dict, Set
 from mongo_utils import get_all_players, insert_players
 
@@ -15,43 +16,52 @@ class ManualNFLValidator:
     
     def __init__(self):
         # Known NFL teams
-        self.nfl_teams = {
+        self.nfl_teams = frozenset({
             'ARI', 'ATL', 'BAL', 'BUF', 'CAR', 'CHI', 'CIN', 'CLE',
             'DAL', 'DEN', 'DET', 'GB', 'HOU', 'IND', 'JAX', 'KC',
             'LV', 'LAC', 'LAR', 'MIA', 'MIN', 'NE', 'NO', 'NYG',
             'NYJ', 'PHI', 'PIT', 'SF', 'SEA', 'TB', 'TEN', 'WAS'
-        }
+        })
         
         # Known non-NFL players to remove (manually identified)
-        self.known_invalid_players = {
+        self.known_invalid_players = frozenset({
             'riley neal',  # Not active NFL player
             'deon jackson',  # Practice squad/inactive
             'malik willis',  # Check if still active
             # Add more as identified
-        }
+        })
         
         # Valid fantasy positions
-        self.valid_positions = {'QB', 'RB', 'WR', 'TE', 'K', 'DEF'}
+        self.valid_positions = frozenset({'QB', 'RB', 'WR', 'TE', 'K', 'DEF'})
+        
+        # Common practice squad indicators in a player's name
+        self.suspicious_indicators = (
+            'practice squad',
+            'futures contract',
+            'undrafted',
+            'waiver',
+        )
     
     def validate_player(self, player: Dict) -> bool:
         """Validate if player should be kept"""
-        name = (player.get('name') or '').lower().strip()
-        position = (player.get('position') or '').upper()
-        team = (player.get('team') or '').upper()
+        get = player.get
+        name = (get('name') or '').lower().strip()
+        position = (get('position') or '').upper()
+        team = (get('team') or '').upper()
         
         # Remove known invalid players
         if name in self.known_invalid_players:
-            logger.debug(f"Removing known invalid player: {name}")
+            logger.debug("Removing known invalid player: %s", name)
             return False
         
         # Must have valid position
         if position not in self.valid_positions:
-            logger.debug(f"Invalid position {position} for {name}")
+            logger.debug("Invalid position %s for %s", position, name)
             return False
         
         # Must have valid NFL team (no None, FA, or empty teams)
         if team not in self.nfl_teams:
-            logger.debug(f"Invalid team {team} for {name}")
+            logger.debug("Invalid team %s for %s", team, name)
             return False
         
         # Additional checks for suspicious players
@@ -64,19 +74,16 @@ class ManualNFLValidator:
         """Check for suspicious player indicators"""
         name = player.get('name', '').lower()
         
-        # Check for common practice squad indicators
-        suspicious_indicators = [
-            'practice squad',
-            'futures contract',
-            'undrafted',
-            'waiver',
-        ]
+        # Check for common practice squad indicators; almost no names carry
+        # one, so this cheap test runs before looking at any stats
+        if not any(indicator in name for indicator in self.suspicious_indicators):
+            return False
         
         # If player has very low or no stats and no ADP, might be practice squad
-        has_stats = any(player.get(stat, 0) > 0 for stat in ['projected_points', 'fantasy_points', 'adp'])
+        has_stats = any(player.get(stat, 0) > 0 for stat in ('projected_points', 'fantasy_points', 'adp'))
         
-        if not has_stats and any(indicator in name for indicator in suspicious_indicators):
-            logger.debug(f"Suspicious player detected: {name}")
+        if not has_stats:
+            logger.debug("Suspicious player detected: %s", name)
             return True
         
         return False
@@ -125,12 +132,7 @@ class ManualNFLValidator:
     
     def _generate_position_summary(self, players: List[Dict]) -> Dict:
         """Generate position breakdown"""
-        position_counts = {}
-        for player in players:
-            pos = player.get('position', 'Unknown')
-            position_counts[pos] = position_counts.get(pos, 0) + 1
-        
-        return position_counts
+        return dict(Counter(player.get('position', 'Unknown') for player in players))
     
     def print_report(self, report: Dict):
         """Print cleaning report"""
@@ -1,9 +1,14 @@
 import os
 import logging
-from typing import List, Dict
-import ssl
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from importlib.util import find_spec
+from typing import List, Dict, Optional, Tuple
 
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne, WriteConcern
+from pymongo.errors import BulkWriteError
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -12,95 +17,365 @@ MONGO_URI = os.getenv("MONGO_URI")
 DB_NAME = os.getenv("MONGO_DB", "fantasy_football")
 COLLECTION_NAME = os.getenv("MONGO_COLLECTION", "players")
 
+# Number of upserts sent to MongoDB per bulk_write round trip
+BATCH_SIZE = 500
+# insert_many batches kept in flight at once during a full reload
+INSERT_WORKERS = 4
+# Drafted-flag updates are tiny, so more of them fit in one bulk_write
+DRAFT_BATCH_SIZE = 1000
+# Server error code for a unique index violation
+DUPLICATE_KEY_ERROR = 11000
+
+# Reads are served from memory for this long; writes made through this module
+# invalidate the cache immediately, writes from other processes within the TTL.
+READ_CACHE_TTL = 30.0
+READ_CACHE_SIZE = 64
+
+# Fields needed to list players in the draft board and CLI summaries
+DEFAULT_PROJECTION = {
+    "_id": 0, "name": 1, "position": 1, "team": 1,
+    "projected_points": 1, "rank": 1, "drafted": 1,
+}
+
 if not MONGO_URI:
     raise ValueError("MONGO_URI not set in environment or .env file.")
 
-# Try different SSL configurations for MongoDB Atlas connection
-try:
-    client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000)
-except Exception:
-    try:
-        # Try with SSL context
-        ssl_context = ssl.create_default_context()
-        ssl_context.check_hostname = False
-        ssl_context.verify_mode = ssl.CERT_NONE
-        client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000, ssl_context=ssl_context)
-    except Exception:
-        # Fallback: disable TLS altogether (not recommended for production)
-        print("Warning: Using insecure connection to MongoDB")
-        client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000, tls=False)
+# Wire compressors in order of preference. zstd and snappy need optional
+# packages; zlib ships with Python and is always offered.
+COMPRESSORS = ",".join(
+    name for name, module in (("zstd", "zstandard"), ("snappy", "snappy"), ("zlib", "zlib"))
+    if find_spec(module) is not None
+)
+
+# A single client owns the connection pool; every query below reuses it.
+# minPoolSize keeps warm connections so requests skip the TCP+TLS handshake.
+client = MongoClient(
+    MONGO_URI,
+    maxPoolSize=50,
+    minPoolSize=10,
+    waitQueueTimeoutMS=5000,
+    serverSelectionTimeoutMS=5000,
+    retryWrites=True,
+    compressors=COMPRESSORS,
+    zlibCompressionLevel=3,
+)
 db = client[DB_NAME]
 collection = db[COLLECTION_NAME]
 
+# Bulk player loads are re-runnable from their source, so they only wait for the
+# primary's acknowledgement instead of the cluster's default (majority on Atlas)
+INGEST_WRITE_CONCERN = WriteConcern(w=1, j=False)
+
 logger = logging.getLogger(__name__)
 
-# Try to connect to MongoDB, fall back to local storage if needed
-mongodb_available = False
-try:
-    db = client[DB_NAME]
-    collection = db[COLLECTION_NAME]
-    # Test the connection
-    client.admin.command('ping')
-    mongodb_available = True
-    logger.info("MongoDB connection successful")
-except Exception as e:
-    logger.warning(f"MongoDB connection failed: {e}")
-    logger.info("Falling back to local JSON storage")
-    from local_store import LocalDataStore
-    local_store = LocalDataStore()
-
-
-def insert_players(players: List[Dict]) -> None:
+# Whether MongoDB answered the first ping; None until a helper needs the database.
+# When it didn't, reads and writes go to the local JSON store instead.
+mongodb_available = None
+local_store = None
+_connect_lock = threading.Lock()
+
+
+def _ensure_indexes() -> None:
+    """Create the indexes used by upserts and position searches.
+
+    ``create_index`` is a no-op when an identical index already exists.
+    """
+    collection.create_index("position")
+    # Every upsert filters on (name, position); without this each one is a collection scan
+    collection.create_index([("name", 1), ("position", 1)], name="name_pos", unique=True)
+
+
+def _ensure_connected() -> bool:
+    """Ping MongoDB on first use, falling back to local storage if needed.
+
+    The result is memoized, so importing this module costs no network round
+    trip and later calls are a plain attribute check.
+    """
+    global mongodb_available, local_store
+    if mongodb_available is not None:
+        return mongodb_available
+
+    with _connect_lock:
+        if mongodb_available is None:
+            try:
+                client.admin.command('ping')
+                logger.info("MongoDB connection successful")
+            except Exception as e:
+                logger.warning(f"MongoDB connection failed: {e}")
+                logger.info("Falling back to local JSON storage")
+                # Share the store instance so every module writes through one buffer
+                import local_store as local_store_module
+                local_store = local_store_module.local_store
+                mongodb_available = False
+            else:
+                try:
+                    _ensure_indexes()
+                except Exception as e:
+                    # Most likely duplicate (name, position) rows left by an older loader
+                    logger.warning("Could not create MongoDB indexes: %s", e)
+                mongodb_available = True
+    return mongodb_available
+
+
+def is_mongodb_available() -> bool:
+    """Return True when player data is stored in MongoDB rather than locally."""
+    return _ensure_connected()
+
+
+_read_cache = OrderedDict()
+_read_cache_lock = threading.RLock()
+# Bumped on every write so reads that raced a write don't cache stale results
+_read_cache_generation = 0
+
+
+def _cache_key(query: Dict, projection: Optional[Dict]):
+    """Hashable key for a read, or None when the query cannot be hashed."""
+    try:
+        key = (frozenset(query.items()), frozenset((projection or {}).items()))
+        hash(key)
+    except TypeError:
+        # Operator queries such as {"$in": [...]} hold lists; don't cache those
+        return None
+    return key
+
+
+def _clear_read_cache() -> None:
+    global _read_cache_generation
+    with _read_cache_lock:
+        _read_cache_generation += 1
+        _read_cache.clear()
+
+
+def insert_players(players: List[Dict], batch_size: int = BATCH_SIZE) -> None:
     """Insert or update player documents in MongoDB or local storage.
 
     Parameters
     ----------
     players: List[Dict]
         Player data to upsert into the collection.
+    batch_size: int
+        Number of upserts sent to MongoDB per ``bulk_write`` call.
     """
 
     if not players:
         logger.info("No players provided for insertion.")
         return
 
-    if mongodb_available:
+    if _ensure_connected():
+        ingest = collection.with_options(write_concern=INGEST_WRITE_CONCERN)
         try:
             inserted = 0
             updated = 0
-            for player in players:
-                filter_ = {"name": player.get("name"), "position": player.get("position")}
-                result = collection.update_one(filter_, {"$set": player}, upsert=True)
-                if result.matched_count:
-                    updated += 1
-                else:
-                    inserted += 1
+            for start in range(0, len(players), batch_size):
+                operations = [
+                    UpdateOne(
+                        {"name": player.get("name"), "position": player.get("position")},
+                        {"$set": player},
+                        upsert=True,
+                    )
+                    for player in players[start:start + batch_size]
+                ]
+                # ordered=False lets the server apply the rest of a batch past a failed write
+                result = ingest.bulk_write(operations, ordered=False)
+                inserted += result.upserted_count
+                updated += result.matched_count
 
             logger.info("Inserted %d players, updated %d players in MongoDB", inserted, updated)
         except Exception as e:
             logger.error("Failed to insert players into MongoDB: %s", e)
             raise
+        finally:
+            _clear_read_cache()
     else:
         local_store.insert_players(players)
 
-def search_players(query: Dict) -> List[Dict]:
-    if mongodb_available:
+def _insert_batch(ingest, batch: List[Dict], start: int) -> int:
+    """Insert one batch, returning how many documents were written."""
+    try:
+        return len(ingest.insert_many(batch, ordered=False).inserted_ids)
+    except BulkWriteError as e:
+        # Unordered inserts still apply every non-duplicate document
+        write_errors = e.details.get("writeErrors", [])
+        duplicates = sum(1 for error in write_errors if error.get("code") == DUPLICATE_KEY_ERROR)
+        if duplicates < len(write_errors) or e.details.get("writeConcernErrors"):
+            logger.error("Failed to insert players in batch starting at %d: %s", start, e.details)
+            raise
+        logger.warning("Skipped %d duplicate players in batch starting at %d", duplicates, start)
+        return e.details.get("nInserted", 0)
+
+def bulk_insert_players(players: List[Dict], batch_size: int = BATCH_SIZE,
+                        max_workers: int = INSERT_WORKERS) -> None:
+    """Replace the whole player collection with ``players``.
+
+    Unlike :func:`insert_players` this does not upsert: the collection is
+    wiped and the players are appended with ``insert_many``, which skips the
+    per-document filter lookup. Use it for first-time or full reloads only.
+
+    Parameters
+    ----------
+    players: List[Dict]
+        Player data that becomes the new contents of the collection.
+    batch_size: int
+        Number of documents sent to MongoDB per ``insert_many`` call.
+    max_workers: int
+        Number of batches kept in flight at once over the client's pool.
+    """
+
+    if not players:
+        logger.info("No players provided for insertion.")
+        return
+
+    if _ensure_connected():
         try:
-            return list(collection.find(query, {"_id": 0}))
+            collection.delete_many({})
+            # The collection is empty here, so the unique index cannot conflict
+            _ensure_indexes()
+
+            # Batches are independent, so overlap their round trips
+            ingest = collection.with_options(write_concern=INGEST_WRITE_CONCERN)
+            starts = range(0, len(players), batch_size)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                inserted = sum(executor.map(
+                    lambda start: _insert_batch(ingest, players[start:start + batch_size], start), starts
+                ))
+
+            logger.info("Loaded %d players into MongoDB", inserted)
+        except Exception as e:
+            logger.error("Failed to load players into MongoDB: %s", e)
+            raise
+        finally:
+            _clear_read_cache()
+    else:
+        local_store.bulk_replace(players)
+
+def search_players(query: Dict, projection: Optional[Dict] = None,
+                   batch_size: int = BATCH_SIZE) -> List[Dict]:
+    """Return the players matching a MongoDB query.
+
+    Parameters
+    ----------
+    query: Dict
+        MongoDB filter, e.g. ``{"position": "RB"}``.
+    projection: Optional[Dict]
+        Fields to return, e.g. :data:`DEFAULT_PROJECTION`; every field except
+        ``_id`` when omitted. The local store always returns full records.
+    batch_size: int
+        Number of documents fetched from MongoDB per cursor round trip.
+
+    MongoDB results are cached for ``READ_CACHE_TTL`` seconds. Callers get
+    shallow copies of the cached records, so setting fields is safe.
+    """
+    if _ensure_connected():
+        key = _cache_key(query, projection)
+        if key is not None:
+            with _read_cache_lock:
+                generation = _read_cache_generation
+                entry = _read_cache.get(key)
+                if entry is not None and time.monotonic() - entry[0] < READ_CACHE_TTL:
+                    _read_cache.move_to_end(key)
+                    return [dict(player) for player in entry[1]]
+        try:
+            players = list(collection.find(query, projection or {"_id": 0}).batch_size(batch_size))
         except Exception as e:
             logger.error("Failed to search players in MongoDB: %s", e)
             return []
+        if key is not None:
+            with _read_cache_lock:
+                if generation == _read_cache_generation:
+                    _read_cache[key] = (time.monotonic(), players)
+                    _read_cache.move_to_end(key)
+                    if len(_read_cache) > READ_CACHE_SIZE:
+                        _read_cache.popitem(last=False)
+            return [dict(player) for player in players]
+        return players
     else:
         return local_store.search_players(query)
 
-def get_all_players() -> List[Dict]:
-    if mongodb_available:
+def get_all_players(projection: Optional[Dict] = None,
+                    batch_size: int = BATCH_SIZE) -> List[Dict]:
+    """Return every player; see :func:`search_players` for the parameters."""
+    if _ensure_connected():
+        return search_players({}, projection, batch_size)
+    else:
+        return local_store.get_all_players()
+
+def get_position_stats() -> Dict[str, Dict[str, int]]:
+    """Count players per position, and how many of them have an ADP.
+
+    Returns
+    -------
+    Dict[str, Dict[str, int]]
+        ``{position: {"count": ..., "with_adp": ...}}``. Players without a
+        position are reported under ``None``.
+    """
+    if _ensure_connected():
+        pipeline = [
+            {"$group": {
+                "_id": "$position",
+                "count": {"$sum": 1},
+                "with_adp": {"$sum": {"$cond": [{"$ifNull": ["$adp", False]}, 1, 0]}},
+            }}
+        ]
         try:
-            return list(collection.find({}, {"_id": 0}))
+            return {
+                row["_id"]: {"count": row["count"], "with_adp": row["with_adp"]}
+                for row in collection.aggregate(pipeline)
+            }
         except Exception as e:
-            logger.error("Failed to retrieve players from MongoDB: %s", e)
-            return []
+            logger.error("Failed to aggregate player stats in MongoDB: %s", e)
+            return {}
+
+    stats = {}
+    for player in local_store.get_all_players():
+        entry = stats.setdefault(player.get("position"), {"count": 0, "with_adp": 0})
+        entry["count"] += 1
+        if player.get("adp"):
+            entry["with_adp"] += 1
+    return stats
+
+def update_players_drafted_status(pairs: List[Tuple[str, bool]],
+                                  batch_size: int = DRAFT_BATCH_SIZE) -> Dict[str, int]:
+    """Update the drafted status of several players in one round trip.
+
+    Parameters
+    ----------
+    pairs: List[Tuple[str, bool]]
+        ``(player_name, drafted)`` pairs to apply.
+    batch_size: int
+        Number of updates sent to MongoDB per ``bulk_write`` call.
+
+    Returns
+    -------
+    Dict[str, int]
+        ``{"matched": ..., "modified": ...}`` counts across all batches.
+
+    Raises
+    ------
+    pymongo.errors.PyMongoError
+        If a batch fails to write; earlier batches stay applied.
+    """
+    counts = {"matched": 0, "modified": 0}
+    if not pairs:
+        return counts
+
+    if _ensure_connected():
+        try:
+            for start in range(0, len(pairs), batch_size):
+                operations = [
+                    UpdateOne({"name": name}, {"$set": {"drafted": drafted}})
+                    for name, drafted in pairs[start:start + batch_size]
+                ]
+                result = collection.bulk_write(operations, ordered=False)
+                counts["matched"] += result.matched_count
+                counts["modified"] += result.modified_count
+        finally:
+            _clear_read_cache()
     else:
-        return local_store.get_all_players()
+        for name, drafted in pairs:
+            if local_store.update_player_drafted_status(name, drafted):
+                counts["matched"] += 1
+                counts["modified"] += 1
+    return counts
 
 def update_player_drafted_status(player_name: str, drafted: bool) -> bool:
     """Update a player's drafted status.
@@ -117,24 +392,21 @@ def update_player_drafted_status(player_name: str, drafted: bool) -> bool:
     bool
         True if update was successful, False otherwise
     """
-    if mongodb_available:
-        try:
-            result = collection.update_one(
-                {"name": player_name},
-                {"$set": {"drafted": drafted}}
-            )
-            if result.matched_count > 0:
-                logger.info(f"Updated drafted status for {player_name} to {drafted}")
-                return True
-            else:
-                logger.warning(f"Player {player_name} not found in database")
-                return False
-        except Exception as e:
-            logger.error(f"Failed to update player drafted status: {e}")
-            return False
-    else:
+    if not _ensure_connected():
         return local_store.update_player_drafted_status(player_name, drafted)
 
+    try:
+        counts = update_players_drafted_status([(player_name, drafted)])
+    except Exception as e:
+        logger.error("Failed to update player drafted status: %s", e)
+        return False
+
+    if counts["matched"] > 0:
+        logger.info("Updated drafted status for %s to %s", player_name, drafted)
+        return True
+    logger.warning("Player %s not found in database", player_name)
+    return False
+
 # Example usage:
 # insert_players([{...}, {...}])
 # print(search_players({"position": "RB"}))
@@ -6,36 +6,119 @@ This module fetches comprehensive NFL player data from multiple sources and
 provides advanced search functionality for the fantasy football draft assistant.
 """
 
+import heapq
 import logging
+import os
+import random
 import requests
 import json
+from collections import Counter
+from operator import itemgetter
 from typing import List, Dict, Any, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from mongo_utils import insert_players
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib codec
+    orjson = None
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_uniform = random.uniform
+
+# Positions we care about for fantasy
+FANTASY_POSITIONS = frozenset(['QB', 'RB', 'WR', 'TE', 'K', 'DEF'])
+INACTIVE_STATUSES = frozenset(['retired', 'suspended'])
+
+# The raw Sleeper dump and its ETag/Last-Modified validators are cached here
+SLEEPER_CACHE_DIR = os.path.join(os.path.dirname(__file__), '.cache')
+
+# Base projections by position (rough estimates)
+BASE_PROJECTIONS = {
+    'QB': 220.0,
+    'RB': 180.0,
+    'WR': 160.0,
+    'TE': 120.0,
+    'K': 100.0,
+    'DEF': 90.0
+}
+
 class NFLPlayerDatabase:
     """Comprehensive NFL player database manager"""
     
-    def __init__(self):
+    def __init__(self, cache_dir: str = SLEEPER_CACHE_DIR):
         self.base_url = "https://api.sleeper.app/v1"
         self.players_cache = {}
         
+        # Keep-alive session so repeated Sleeper calls reuse the TCP+TLS connection
+        self.session = requests.Session()
+        retries = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+        self.session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=10, max_retries=retries))
+        self.session.headers.update({
+            'Accept-Encoding': 'gzip',
+            'User-Agent': 'ff-draft-assistant/1.0'
+        })
+        self.cache_file = os.path.join(cache_dir, 'sleeper_players_nfl.json')
+        self.validators_file = self.cache_file + '.headers'
+    
+    def _load_validators(self) -> Dict[str, str]:
+        """Conditional request headers for the cached Sleeper dump, if any"""
+        if not os.path.exists(self.cache_file):
+            return {}
+        try:
+            with open(self.validators_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _store_response(self, response: requests.Response) -> None:
+        """Keep the Sleeper dump on disk when the server sent validators for it"""
+        validators = {}
+        if response.headers.get('ETag'):
+            validators['If-None-Match'] = response.headers['ETag']
+        if response.headers.get('Last-Modified'):
+            validators['If-Modified-Since'] = response.headers['Last-Modified']
+        if not validators:
+            return
+        
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            tmp_path = self.cache_file + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(response.content)
+            os.replace(tmp_path, self.cache_file)
+            with open(self.validators_file, 'w', encoding='utf-8') as f:
+                json.dump(validators, f)
+        except OSError as e:
+            logger.warning("Could not cache Sleeper player dump: %s", e)
+        
     def fetch_all_nfl_players(self) -> Dict[str, Any]:
         """Fetch all NFL players from Sleeper API"""
         try:
             logger.info("Fetching comprehensive NFL player database from Sleeper API...")
-            response = requests.get(f"{self.base_url}/players/nfl", timeout=30)
-            response.raise_for_status()
+            # Revalidate the cached dump; a 304 skips the multi-MB download
+            response = self.session.get(f"{self.base_url}/players/nfl",
+                                        headers=self._load_validators(), timeout=30)
+            if response.status_code == 304:
+                logger.info("Sleeper player dump unchanged; using cached copy")
+                with open(self.cache_file, 'rb') as f:
+                    content = f.read()
+            else:
+                response.raise_for_status()
+                content = response.content
+                self._store_response(response)
             
-            players_data = response.json()
+            # The full Sleeper dump is several MB; orjson decodes it far faster
+            players_data = orjson.loads(content) if orjson else json.loads(content)
             logger.info(f"Successfully fetched {len(players_data)} NFL players")
             self.players_cache = players_data
             return players_data
             
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, OSError) as e:
             logger.error(f"Failed to fetch NFL players: {e}")
             return {}
     
@@ -43,38 +126,35 @@ class NFLPlayerDatabase:
         """Filter and format players for fantasy relevance"""
         fantasy_players = []
         
-        # Positions we care about for fantasy
-        fantasy_positions = ['QB', 'RB', 'WR', 'TE', 'K', 'DEF']
-        
         for player_id, player_info in players_data.items():
             try:
-                # Skip players without essential info
-                if not player_info.get('position') or not player_info.get('full_name'):
-                    continue
-                    
-                position = player_info.get('position', '')
-                if position not in fantasy_positions:
+                get = player_info.get
+                
+                # Skip players without essential info or outside the fantasy positions
+                position = get('position')
+                name = get('full_name')
+                if position not in FANTASY_POSITIONS or not name:
                     continue
                 
                 # Skip inactive/retired players where possible
-                status = player_info.get('status', '').lower()
-                if status in ['retired', 'suspended']:
+                status = get('status', 'Active')
+                if status.lower() in INACTIVE_STATUSES:
                     continue
                 
                 # Create standardized player record
                 player_record = {
                     'player_id': player_id,
-                    'name': player_info.get('full_name', ''),
+                    'name': name,
                     'position': position,
-                    'team': player_info.get('team', ''),
-                    'number': player_info.get('number'),
-                    'age': player_info.get('age'),
-                    'height': player_info.get('height', ''),
-                    'weight': player_info.get('weight'),
-                    'college': player_info.get('college', ''),
-                    'years_exp': player_info.get('years_exp', 0),
-                    'status': player_info.get('status', 'Active'),
-                    'injury_status': player_info.get('injury_status', ''),
+                    'team': get('team', ''),
+                    'number': get('number'),
+                    'age': get('age'),
+                    'height': get('height', ''),
+                    'weight': get('weight'),
+                    'college': get('college', ''),
+                    'years_exp': get('years_exp', 0),
+                    'status': status,
+                    'injury_status': get('injury_status', ''),
                     'projected_points': self._estimate_fantasy_points(player_info),
                     'avg_points': 0.0,  # Will be updated with actual data later
                     'drafted': False,
@@ -89,33 +169,23 @@ class NFLPlayerDatabase:
                 continue
         
         # Sort by estimated fantasy value and assign ranks
-        fantasy_players.sort(key=lambda x: x['projected_points'], reverse=True)
-        for i, player in enumerate(fantasy_players):
-            player['rank'] = str(i + 1)
+        fantasy_players.sort(key=itemgetter('projected_points'), reverse=True)
+        for rank, player in enumerate(fantasy_players, 1):
+            player['rank'] = str(rank)
         
         logger.info(f"Processed {len(fantasy_players)} fantasy-relevant players")
         return fantasy_players
     
     def _estimate_fantasy_points(self, player_info: Dict[str, Any]) -> float:
         """Estimate fantasy points based on position and other factors"""
-        position = player_info.get('position', '')
-        years_exp = player_info.get('years_exp', 0)
-        age = player_info.get('age', 25)
-        
-        # Base projections by position (rough estimates)
-        base_projections = {
-            'QB': 220.0,
-            'RB': 180.0,
-            'WR': 160.0,
-            'TE': 120.0,
-            'K': 100.0,
-            'DEF': 90.0
-        }
+        get = player_info.get
+        years_exp = get('years_exp', 0)
+        age = get('age', 25)
         
-        base_points = base_projections.get(position, 50.0)
+        base_points = BASE_PROJECTIONS.get(get('position', ''), 50.0)
         
         # Adjust for experience (peak around 3-8 years)
-        if years_exp >= 2 and years_exp <= 8:
+        if 2 <= years_exp <= 8:
             experience_modifier = 1.1
         elif years_exp > 8 or years_exp == 0:
             experience_modifier = 0.8
@@ -123,7 +193,7 @@ class NFLPlayerDatabase:
             experience_modifier = 0.9
         
         # Adjust for age (peak around 24-28)
-        if age >= 24 and age <= 28:
+        if 24 <= age <= 28:
             age_modifier = 1.0
         elif age > 28:
             age_modifier = max(0.7, 1.0 - (age - 28) * 0.05)
@@ -133,17 +203,19 @@ class NFLPlayerDatabase:
         estimated_points = base_points * experience_modifier * age_modifier
         
         # Add some randomization for variety
-        import random
-        estimated_points *= random.uniform(0.7, 1.3)
+        estimated_points *= _uniform(0.7, 1.3)
         
         return round(estimated_points, 1)
     
     def get_top_players_by_position(self, players: List[Dict[str, Any]], 
                                   position: str, limit: int = 50) -> List[Dict[str, Any]]:
         """Get top players for a specific position"""
-        position_players = [p for p in players if p['position'] == position]
-        position_players.sort(key=lambda x: x['projected_points'], reverse=True)
-        return position_players[:limit]
+        # Partial selection: only the top `limit` players are ever ordered
+        return heapq.nlargest(
+            limit,
+            (p for p in players if p['position'] == position),
+            key=itemgetter('projected_points'),
+        )
     
     def populate_database(self, max_players: int = 1000) -> bool:
         """Populate the database with comprehensive NFL player data"""
@@ -157,20 +229,22 @@ class NFLPlayerDatabase:
             # Process and filter for fantasy relevance
             fantasy_players = self.get_fantasy_relevant_players(all_players)
             
+            # Release the raw Sleeper dump (~10k nested dicts) before inserting
+            del all_players
+            self.players_cache = {}
+            
             # Limit to specified number (top players by projected points)
             if len(fantasy_players) > max_players:
                 fantasy_players = fantasy_players[:max_players]
                 logger.info(f"Limited to top {max_players} players")
             
-            # Insert into database
+            # Upsert rather than replace: the collection also holds drafted flags,
+            # merged ADP fields and players from other sources
             logger.info(f"Inserting {len(fantasy_players)} players into database...")
             insert_players(fantasy_players)
             
             # Log summary by position
-            position_counts = {}
-            for player in fantasy_players:
-                pos = player['position']
-                position_counts[pos] = position_counts.get(pos, 0) + 1
+            position_counts = Counter(p['position'] for p in fantasy_players)
             
             logger.info("Players added by position:")
             for pos, count in sorted(position_counts.items()):
@@ -206,7 +280,7 @@ def create_mock_comprehensive_database() -> List[Dict[str, Any]]:
             'name': name, 'position': 'QB', 'team': team, 'age': age,
             'projected_points': proj, 'avg_points': round(proj * 0.7, 1),
             'drafted': False, 'source': 'NFL_Mock_Comprehensive',
-            'rank': str(i + 1), 'years_exp': max(1, age - 22),
+            'years_exp': max(1, age - 22),
             'status': 'Active', 'injury_status': '', 'height': '6\'3"', 'weight': 225
         })
     
@@ -233,7 +307,7 @@ def create_mock_comprehensive_database() -> List[Dict[str, Any]]:
             'name': name, 'position': 'RB', 'team': team, 'age': age,
             'projected_points': proj, 'avg_points': round(proj * 0.7, 1),
             'drafted': False, 'source': 'NFL_Mock_Comprehensive',
-            'rank': str(len(mock_players) + 1), 'years_exp': max(1, age - 22),
+            'years_exp': max(1, age - 22),
             'status': 'Active', 'injury_status': '', 'height': '5\'11"', 'weight': 215
         })
     
@@ -262,7 +336,7 @@ def create_mock_comprehensive_database() -> List[Dict[str, Any]]:
             'name': name, 'position': 'WR', 'team': team, 'age': age,
             'projected_points': proj, 'avg_points': round(proj * 0.7, 1),
             'drafted': False, 'source': 'NFL_Mock_Comprehensive',
-            'rank': str(len(mock_players) + 1), 'years_exp': max(1, age - 22),
+            'years_exp': max(1, age - 22),
             'status': 'Active', 'injury_status': '', 'height': '6\'1"', 'weight': 200
         })
     
@@ -284,7 +358,7 @@ def create_mock_comprehensive_database() -> List[Dict[str, Any]]:
             'name': name, 'position': 'TE', 'team': team, 'age': age,
             'projected_points': proj, 'avg_points': round(proj * 0.7, 1),
             'drafted': False, 'source': 'NFL_Mock_Comprehensive',
-            'rank': str(len(mock_players) + 1), 'years_exp': max(1, age - 22),
+            'years_exp': max(1, age - 22),
             'status': 'Active', 'injury_status': '', 'height': '6\'4"', 'weight': 250
         })
     
@@ -303,7 +377,7 @@ def create_mock_comprehensive_database() -> List[Dict[str, Any]]:
             'name': name, 'position': 'K', 'team': team, 'age': age,
             'projected_points': proj, 'avg_points': round(proj * 0.7, 1),
             'drafted': False, 'source': 'NFL_Mock_Comprehensive',
-            'rank': str(len(mock_players) + 1), 'years_exp': max(1, age - 22),
+            'years_exp': max(1, age - 22),
             'status': 'Active', 'injury_status': '', 'height': '6\'0"', 'weight': 190
         })
     
@@ -321,10 +395,14 @@ def create_mock_comprehensive_database() -> List[Dict[str, Any]]:
             'name': f"{name} Defense", 'position': 'DEF', 'team': team, 'age': 0,
             'projected_points': proj, 'avg_points': round(proj * 0.7, 1),
             'drafted': False, 'source': 'NFL_Mock_Comprehensive',
-            'rank': str(len(mock_players) + 1), 'years_exp': 0,
+            'years_exp': 0,
             'status': 'Active', 'injury_status': '', 'height': '', 'weight': 0
         })
     
+    # Rank across positions by projected points, as the live Sleeper path does
+    for rank, player in enumerate(sorted(mock_players, key=itemgetter('projected_points'), reverse=True), 1):
+        player['rank'] = str(rank)
+    
     return mock_players
 
 def main():
@@ -345,10 +423,7 @@ def main():
             insert_players(mock_players)
             
             # Summary
-            position_counts = {}
-            for player in mock_players:
-                pos = player['position']
-                position_counts[pos] = position_counts.get(pos, 0) + 1
+            position_counts = Counter(p['position'] for p in mock_players)
             
             print(f"\n✅ Successfully populated database with {len(mock_players)} NFL players!")
             print("\nPlayers by position:")
@@ -1,12 +1,32 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import logging
+from functools import lru_cache
 from typing import List, Dict, Optional, Set
 from datetime import datetime, timedelta
 import json
 import os
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib codec
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# Stats whose presence marks a zero-experience player as actually playing
+ROOKIE_STAT_KEYS = frozenset(['rec_tds', 'rush_tds', 'pass_tds', 'fgm', 'rec', 'rush_att', 'pass_att'])
+
+# Drop periods and apostrophes, treat hyphens as spaces
+_NAME_TRANS = str.maketrans({'.': '', "'": '', '-': ' '})
+
+
+def _clean_name(name: str) -> str:
+    """Normalize a player name for matching, in a single translate pass"""
+    return ' '.join(name.lower().translate(_NAME_TRANS).split())
+
+
 class NFLRosterValidator:
     """Enhanced NFL roster validation using multiple data sources"""
     
@@ -14,6 +34,15 @@ class NFLRosterValidator:
         self.cache_file = "nfl_roster_cache.json"
         self.cache_duration = timedelta(hours=24)  # Cache for 24 hours
         
+        # Keep-alive session shared by every Sleeper request this instance makes
+        self.session = requests.Session()
+        retries = Retry(total=2, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+        self.session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retries))
+        self.session.headers.update({
+            'Accept-Encoding': 'gzip',
+            'User-Agent': 'ff-draft-assistant/1.0'
+        })
+        
         # NFL data sources (free APIs)
         self.data_sources = [
             {
@@ -42,12 +71,18 @@ class NFLRosterValidator:
         self.active_players = set()
         self.player_details = {}
         
+        # Fuzzy-match candidates, rebuilt whenever active_players is replaced
+        self._pos_team_index = {}
+        self._pos_team_index_source = None
+        
     def get_active_nfl_players(self) -> Set[str]:
         """Get set of active NFL player keys"""
         # Try cache first
         cached_data = self._load_cached_roster()
         if cached_data:
             logger.info("Using cached NFL roster data")
+            # Keep it, or every validate_player call re-reads the cache file
+            self.active_players = cached_data
             return cached_data
         
         # Fetch fresh data
@@ -76,10 +111,13 @@ class NFLRosterValidator:
     def _fetch_from_source(self, source: Dict) -> Optional[Set[str]]:
         """Fetch player data from a specific source"""
         try:
-            response = requests.get(source['url'], timeout=30)
+            response = self.session.get(source['url'], timeout=30)
             response.raise_for_status()
             
-            data = response.json()
+            # The Sleeper dump is several MB; orjson decodes it far faster
+            data = orjson.loads(response.content) if orjson else response.json()
+            # Free the raw body before the parse builds its own records
+            del response
             return source['parser'](data)
             
         except Exception as e:
@@ -94,18 +132,22 @@ class NFLRosterValidator:
         for player_id, player_info in data.items():
             if not isinstance(player_info, dict):
                 continue
+            get = player_info.get
+            
+            # Must have valid team and position; most of the dump (free agents,
+            # defensive players) is rejected here before any string work
+            team = get('team')
+            position = get('position')
+            if not team or position not in self.nfl_team_depth_positions or team.upper() in ['NONE', 'NULL']:
+                continue
                 
             # Check if player is active
-            status = player_info.get('status', '').upper()
+            status = get('status', '').upper()
             if status in ['RETIRED', 'SUSPENDED', 'INACTIVE']:
                 continue
             
-            # Must have valid team and position
-            team = player_info.get('team')
-            position = player_info.get('position')
-            name = player_info.get('full_name') or f"{player_info.get('first_name', '')} {player_info.get('last_name', '')}".strip()
-            
-            if not team or not position or not name or team.upper() in ['NONE', 'NULL', '']:
+            name = get('full_name') or f"{get('first_name', '')} {get('last_name', '')}".strip()
+            if not name:
                 continue
             
             # Filter by fantasy relevance and roster likelihood
@@ -121,11 +163,11 @@ class NFLRosterValidator:
                 'position': position,
                 'team': team,
                 'status': status,
-                'years_exp': player_info.get('years_exp', 0),
-                'age': player_info.get('age'),
-                'height': player_info.get('height'),
-                'weight': player_info.get('weight'),
-                'college': player_info.get('college'),
+                'years_exp': get('years_exp', 0),
+                'age': get('age'),
+                'height': get('height'),
+                'weight': get('weight'),
+                'college': get('college'),
                 'sleeper_id': player_id
             }
         
@@ -177,21 +219,19 @@ class NFLRosterValidator:
         # Players with 0 years experience might be practice squad
         # Include them if they have recent activity
         if years_exp == 0:
-            # Check for rookie indicators
-            stats_keys = ['rec_tds', 'rush_tds', 'pass_tds', 'fgm', 'rec', 'rush_att', 'pass_att']
-            has_stats = any(player_info.get(key, 0) > 0 for key in stats_keys)
-            return has_stats
+            # Check for rookie indicators; Sleeper metadata almost never carries
+            # stats, so test for the keys at all before reading any values
+            if ROOKIE_STAT_KEYS.isdisjoint(player_info):
+                return False
+            return any(player_info.get(key, 0) > 0 for key in ROOKIE_STAT_KEYS)
         
         return True
     
-    def _create_player_key(self, name: str, position: str, team: str) -> str:
-        """Create consistent player key for matching"""
-        # Normalize name
-        clean_name = name.lower().strip()
-        clean_name = clean_name.replace('.', '').replace("'", '').replace('-', ' ')
-        clean_name = ' '.join(clean_name.split())
-        
-        return f"{clean_name}_{position.upper()}_{team.upper()}"
+    @staticmethod
+    @lru_cache(maxsize=32768)
+    def _create_player_key(name: str, position: str, team: str) -> str:
+        """Create consistent player key for matching (memoized)"""
+        return f"{_clean_name(name)}_{position.upper()}_{team.upper()}"
     
     def validate_player(self, player: Dict) -> bool:
         """Validate if player is active NFL player"""
@@ -218,26 +258,36 @@ class NFLRosterValidator:
         
         return is_active
     
+    def _get_pos_team_index(self) -> Dict:
+        """Group active player names by (position, team) for fuzzy matching"""
+        if self._pos_team_index_source is not self.active_players:
+            index = {}
+            for player_key in self.active_players:
+                key_parts = player_key.rsplit('_', 2)
+                if len(key_parts) == 3:
+                    key_name, key_position, key_team = key_parts
+                    index.setdefault((key_position, key_team), []).append(key_name)
+            self._pos_team_index = index
+            self._pos_team_index_source = self.active_players
+        return self._pos_team_index
+    
     def _fuzzy_match_player(self, name: str, position: str, team: str) -> bool:
         """Attempt fuzzy matching for player names"""
         from difflib import SequenceMatcher
         
-        clean_name = name.lower().replace('.', '').replace("'", '').replace('-', ' ')
-        clean_name = ' '.join(clean_name.split())
+        clean_name = _clean_name(name)
         
-        # Look for similar names in same position and team
-        for player_key in self.active_players:
-            key_parts = player_key.split('_')
-            if len(key_parts) >= 3:
-                key_name = key_parts[0]
-                key_position = key_parts[1]
-                key_team = key_parts[2]
-                
-                if key_position == position.upper() and key_team == team.upper():
-                    similarity = SequenceMatcher(None, clean_name, key_name).ratio()
-                    if similarity > 0.85:  # 85% similarity threshold
-                        logger.debug(f"Fuzzy matched: {name} -> {key_name} (similarity: {similarity:.2f})")
-                        return True
+        # Only names in the same position and team (a few dozen at most) are candidates.
+        # ratio() is not symmetric, so keep the original (query, candidate) order.
+        for key_name in self._get_pos_team_index().get((position.upper(), team.upper()), ()):
+            matcher = SequenceMatcher(None, clean_name, key_name)
+            # The quick ratios are cheap upper bounds on ratio(); skip pairs that can't pass
+            if matcher.real_quick_ratio() <= 0.85 or matcher.quick_ratio() <= 0.85:
+                continue
+            similarity = matcher.ratio()
+            if similarity > 0.85:  # 85% similarity threshold
+                logger.debug(f"Fuzzy matched: {name} -> {key_name} (similarity: {similarity:.2f})")
+                return True
         
         return False
     
@@ -252,8 +302,12 @@ class NFLRosterValidator:
             return None
         
         try:
-            with open(self.cache_file, 'r') as f:
-                cache_data = json.load(f)
+            if orjson:
+                with open(self.cache_file, 'rb') as f:
+                    cache_data = orjson.loads(f.read())
+            else:
+                with open(self.cache_file, 'r') as f:
+                    cache_data = json.load(f)
             
             cache_time = datetime.fromisoformat(cache_data['timestamp'])
             if datetime.now() - cache_time < self.cache_duration:
@@ -273,8 +327,12 @@ class NFLRosterValidator:
                 'count': len(active_players)
             }
             
-            with open(self.cache_file, 'w') as f:
-                json.dump(cache_data, f, indent=2)
+            if orjson:
+                with open(self.cache_file, 'wb') as f:
+                    f.write(orjson.dumps(cache_data, option=orjson.OPT_INDENT_2))
+            else:
+                with open(self.cache_file, 'w') as f:
+                    json.dump(cache_data, f, indent=2)
             
             logger.info(f"Cached {len(active_players)} active NFL players")
             
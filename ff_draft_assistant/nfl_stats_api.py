@@ -1,12 +1,28 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 import json
 import os
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib codec
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# Characters dropped when comparing player names
+_NAME_STRIP = str.maketrans('', '', ".'")
+
+
+def _normalize_name(name: str) -> str:
+    return name.lower().translate(_NAME_STRIP)
+
+
 class NFLStatsAPI:
     """NFL Statistics API integration for player historical data"""
     
@@ -14,10 +30,26 @@ class NFLStatsAPI:
         self.cache_duration = timedelta(hours=12)
         self.stats_cache_dir = "stats_cache"
         
+        # Sleeper player IDs by (normalized name, position), built on first lookup
+        self._name_index = None
+        self._name_index_built = None
+        
+        # League-wide season stats by year, with the time they were loaded
+        self._year_stats_cache = {}
+        
         # Create cache directory if it doesn't exist
         if not os.path.exists(self.stats_cache_dir):
             os.makedirs(self.stats_cache_dir)
         
+        # Keep-alive session shared by every Sleeper request this instance makes
+        self.session = requests.Session()
+        retries = Retry(total=2, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+        self.session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retries))
+        self.session.headers.update({
+            'Accept-Encoding': 'gzip',
+            'User-Agent': 'ff-draft-assistant/1.0'
+        })
+        
         # Free NFL stats APIs
         self.apis = {
             'sleeper': {
@@ -59,23 +91,28 @@ class NFLStatsAPI:
         }
         
         try:
-            # Get player data from Sleeper first for ID mapping
-            sleeper_data = self._get_sleeper_player_data()
-            player_id = self._find_player_id(player_name, position, sleeper_data)
+            # Map the name to a Sleeper player ID
+            player_id = self._find_player_id(player_name, position)
             
             if not player_id:
                 logger.warning(f"Could not find player ID for {player_name}")
                 return career_stats
             
-            # Get stats for each year
-            for year in years:
-                year_stats = self._get_year_stats(player_id, year, position)
-                if year_stats:
-                    career_stats['seasons'][year] = year_stats
+            # Each year is an independent request; fetch them concurrently.
+            # map() keeps the seasons in year order.
+            with ThreadPoolExecutor(max_workers=max(1, min(8, len(years)))) as executor:
+                all_year_stats = executor.map(
+                    lambda year: self._get_year_stats(player_id, year, position), years
+                )
+                for year, year_stats in zip(years, all_year_stats):
+                    if year_stats:
+                        career_stats['seasons'][year] = year_stats
             
             # Calculate career totals and averages
             career_stats['career_totals'] = self._calculate_career_totals(career_stats['seasons'], position)
-            career_stats['averages'] = self._calculate_averages(career_stats['seasons'], position)
+            career_stats['averages'] = self._calculate_averages(
+                career_stats['seasons'], position, career_stats['career_totals']
+            )
             
             # Cache the results
             self._cache_stats(cache_key, career_stats)
@@ -120,52 +157,73 @@ class NFLStatsAPI:
     def _get_sleeper_player_data(self) -> Dict:
         """Get all player data from Sleeper API"""
         try:
-            response = requests.get(f"{self.apis['sleeper']['base_url']}/players/nfl", timeout=10)
+            response = self.session.get(f"{self.apis['sleeper']['base_url']}/players/nfl", timeout=10)
             response.raise_for_status()
-            return response.json()
+            return orjson.loads(response.content) if orjson else response.json()
         except Exception as e:
             logger.error(f"Error fetching Sleeper player data: {e}")
             return {}
     
-    def _find_player_id(self, player_name: str, position: str, sleeper_data: Dict) -> Optional[str]:
-        """Find player ID from Sleeper data"""
-        normalized_name = player_name.lower().replace('.', '').replace("'", '')
-        
+    def _get_name_index(self) -> Dict:
+        """Get the (normalized name, position) -> Sleeper ID index, rebuilding it when stale"""
+        if self._name_index is None or datetime.now() - self._name_index_built > self.cache_duration:
+            sleeper_data = self._get_sleeper_player_data()
+            if not sleeper_data:
+                return self._name_index or {}
+            self._name_index = self._build_name_index(sleeper_data)
+            self._name_index_built = datetime.now()
+        return self._name_index
+    
+    @staticmethod
+    def _build_name_index(sleeper_data: Dict) -> Dict:
+        """Index Sleeper players by full name and by first + last name"""
+        name_index = {}
         for player_id, player_info in sleeper_data.items():
             if not isinstance(player_info, dict):
                 continue
+            get = player_info.get
+            position = get('position')
             
-            # Check full name
-            full_name = player_info.get('full_name', '').lower().replace('.', '').replace("'", '')
-            if full_name == normalized_name and player_info.get('position') == position:
-                return player_id
-            
-            # Check first + last name combination
-            first_name = player_info.get('first_name', '').lower()
-            last_name = player_info.get('last_name', '').lower()
-            combined_name = f"{first_name} {last_name}".replace('.', '').replace("'", '')
-            
-            if combined_name == normalized_name and player_info.get('position') == position:
-                return player_id
-        
-        return None
+            # The first player in Sleeper order wins, as with the old linear scan
+            full_name = _normalize_name(get('full_name') or '')
+            name_index.setdefault((full_name, position), player_id)
+            combined_name = _normalize_name(f"{get('first_name') or ''} {get('last_name') or ''}")
+            name_index.setdefault((combined_name, position), player_id)
+        return name_index
+    
+    def _find_player_id(self, player_name: str, position: str) -> Optional[str]:
+        """Find player ID from Sleeper data"""
+        return self._get_name_index().get((_normalize_name(player_name), position))
+    
+    def _get_all_year_stats(self, year: int) -> Dict:
+        """Get the league-wide stats blob for a season, keyed by Sleeper player ID"""
+        cached = self._year_stats_cache.get(year)
+        if cached and datetime.now() - cached[0] < self.cache_duration:
+            return cached[1]
+        
+        cache_key = f"year_{year}"
+        all_stats = self._load_cached_stats(cache_key)
+        if all_stats is None:
+            try:
+                stats_url = f"{self.apis['sleeper']['base_url']}/stats/nfl/regular/{year}"
+                response = self.session.get(stats_url, timeout=10)
+                if response.status_code != 200:
+                    return {}
+                all_stats = orjson.loads(response.content) if orjson else response.json()
+            except Exception as e:
+                logger.debug(f"Error fetching {year} stats: {e}")
+                return {}
+            self._cache_stats(cache_key, all_stats)
+        
+        self._year_stats_cache[year] = (datetime.now(), all_stats)
+        return all_stats
     
     def _get_year_stats(self, player_id: str, year: int, position: str) -> Dict:
         """Get stats for a specific year"""
-        try:
-            # Try Sleeper stats endpoint
-            stats_url = f"{self.apis['sleeper']['base_url']}/stats/nfl/regular/{year}"
-            response = requests.get(stats_url, timeout=10)
-            
-            if response.status_code == 200:
-                all_stats = response.json()
-                player_stats = all_stats.get(player_id, {})
-                
-                if player_stats:
-                    return self._normalize_stats(player_stats, position, year)
-            
-        except Exception as e:
-            logger.debug(f"Error fetching {year} stats for player {player_id}: {e}")
+        # The endpoint returns the whole league, so every player shares one download
+        player_stats = self._get_all_year_stats(year).get(player_id)
+        if player_stats:
+            return self._normalize_stats(player_stats, position, year)
         
         return {}
     
@@ -224,39 +282,31 @@ class NFLStatsAPI:
         
         return totals
     
-    def _calculate_averages(self, seasons: Dict, position: str) -> Dict:
+    def _calculate_averages(self, seasons: Dict, position: str, totals: Optional[Dict] = None) -> Dict:
         """Calculate per-game and per-season averages"""
         if not seasons:
             return {}
         
-        # Per-season averages
-        per_season = {}
-        total_games = 0
-        games_played_seasons = 0
-        
-        for year_stats in seasons.values():
-            games = year_stats.get('games_played', 0)
-            if games > 0:
-                total_games += games
-                games_played_seasons += 1
-            
-            for stat, value in year_stats.items():
-                if stat not in ['year', 'games_played'] and isinstance(value, (int, float)):
-                    per_season[f"{stat}_per_season"] = per_season.get(f"{stat}_per_season", 0) + value
+        # Averages are career totals divided out; reuse them rather than summing again
+        if totals is None:
+            totals = self._calculate_career_totals(seasons, position)
+        total_games = sum(
+            games for games in (year_stats.get('games_played', 0) for year_stats in seasons.values())
+            if games > 0
+        )
         
         # Calculate averages
         averages = {}
         season_count = len(seasons)
+        stat_totals = [(stat, total) for stat, total in totals.items() if stat != 'games_played']
         
-        if season_count > 0:
-            for stat, total in per_season.items():
-                averages[stat] = round(total / season_count, 1)
+        for stat, total in stat_totals:
+            averages[f"{stat}_per_season"] = round(total / season_count, 1)
         
         # Per-game averages
         if total_games > 0:
-            for stat, total_value in per_season.items():
-                stat_name = stat.replace('_per_season', '')
-                averages[f"{stat_name}_per_game"] = round(total_value / total_games, 1)
+            for stat, total in stat_totals:
+                averages[f"{stat}_per_game"] = round(total / total_games, 1)
         
         return averages
     
@@ -285,8 +335,12 @@ class NFLStatsAPI:
             return None
         
         try:
-            with open(cache_file, 'r') as f:
-                cache_data = json.load(f)
+            if orjson:
+                with open(cache_file, 'rb') as f:
+                    cache_data = orjson.loads(f.read())
+            else:
+                with open(cache_file, 'r') as f:
+                    cache_data = json.load(f)
             
             cache_time = datetime.fromisoformat(cache_data['cached_at'])
             if datetime.now() - cache_time < self.cache_duration:
@@ -307,8 +361,13 @@ class NFLStatsAPI:
                 'cached_at': datetime.now().isoformat()
             }
             
-            with open(cache_file, 'w') as f:
-                json.dump(cache_data, f, indent=2)
+            if orjson:
+                # Season maps are keyed by int year; json.dump stringifies those keys too
+                with open(cache_file, 'wb') as f:
+                    f.write(orjson.dumps(cache_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+            else:
+                with open(cache_file, 'w') as f:
+                    json.dump(cache_data, f, indent=2)
             
             logger.debug(f"Cached stats for {cache_key}")
             
@@ -1,10 +1,24 @@
 import os
+import json
 import openai
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import List, Dict
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib codec
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+OPENAI_MODEL = "gpt-4o-mini"
+SYSTEM_PROMPT = 'Respond with a JSON object of the form {"rows": [...]} only.'
+# Parse requests kept in flight at once by parse_tables_batch
+OPENAI_MAX_CONCURRENCY = 8
+
+@lru_cache(maxsize=1)
 def get_openai_api_key():
     # Try to load from environment variable
     api_key = os.getenv("OPENAI_API_KEY")
@@ -18,21 +32,31 @@ def get_openai_api_key():
     return api_key
 
 
+@lru_cache(maxsize=1)
+def _client():
+    """Shared OpenAI client, so its HTTP connection pool survives between calls."""
+    return openai.OpenAI(api_key=get_openai_api_key())
+
+
 def parse_table_with_openai(text: str, columns: List[str]) -> List[Dict[str, str]]:
     """
     Use OpenAI to parse a block of text into a list of dicts with the given columns.
     Compatible with openai>=1.0.0 client interface.
     """
-    api_key = get_openai_api_key()
     prompt = (
-        f"Extract the following fantasy football rankings into a JSON array of objects with columns: {', '.join(columns)}. "
+        f"Extract the following fantasy football rankings into JSON objects with columns: {', '.join(columns)}. "
         "If a value is missing, use an empty string. Data:\n" + text
     )
-    client = openai.OpenAI(api_key=api_key)
+    client = _client()
     try:
+        # JSON mode guarantees a bare JSON object, so no code fences to strip
         response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}],
+            model=OPENAI_MODEL,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt},
+            ],
+            response_format={"type": "json_object"},
             max_tokens=1500,
             temperature=0
         )
@@ -57,22 +81,18 @@ def parse_table_with_openai(text: str, columns: List[str]) -> List[Dict[str, str
 
     content = choice.message.content
 
-    import json
-    import re
     try:
-        # Remove markdown code block markers if present
-        content = content.strip()
-        if content.startswith('```json'):
-            content = content[len('```json'):].strip()
-        if content.startswith('```'):
-            content = content[len('```'):].strip()
-        if content.endswith('```'):
-            content = content[:-3].strip()
-        # Now extract JSON array
-        start = content.find('[')
-        end = content.rfind(']') + 1
-        json_str = content[start:end]
-        return json.loads(json_str)
+        data = orjson.loads(content) if orjson else json.loads(content)
+        if not isinstance(data, dict):
+            return data
+        # JSON mode returns an object; the prompt asks for {"rows": [...]}, but
+        # accept any other key as long as it holds the only list
+        if "rows" in data:
+            return data["rows"]
+        lists = [value for value in data.values() if isinstance(value, list)]
+        if len(lists) != 1:
+            raise ValueError("Expected a single list of rows in the response object")
+        return lists[0]
     except Exception:
         logger.exception(
             "Failed to parse OpenAI response", extra={"response_content": content}
@@ -80,3 +100,16 @@ def parse_table_with_openai(text: str, columns: List[str]) -> List[Dict[str, str
         raise ValueError(
             f"Could not parse OpenAI response as JSON.\nResponse: {content}"
         )
+
+
+def parse_tables_batch(texts: List[str], columns: List[str],
+                       max_concurrency: int = OPENAI_MAX_CONCURRENCY) -> List[List[Dict[str, str]]]:
+    """
+    Parse several blocks of text concurrently with parse_table_with_openai.
+    Each call mostly waits on the API, so threads overlap the round trips.
+    Results are returned in the same order as ``texts``.
+    """
+    if not texts:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_concurrency, len(texts))) as executor:
+        return list(executor.map(lambda text: parse_table_with_openai(text, columns), texts))
@@ -0,0 +1,38 @@
+"""
+Flask JSON provider backed by orjson.
+
+orjson serializes the large player payloads returned by the ``/api/*``
+endpoints several times faster than the stdlib ``json`` module. When
+orjson is not installed the provider behaves exactly like Flask's
+``DefaultJSONProvider``.
+"""
+
+from typing import Any
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib codec
+    orjson = None
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """JSON provider that delegates encoding and decoding to orjson"""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if orjson is None:
+            return super().dumps(obj, **kwargs)
+
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+
+        return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if orjson is None:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
@@ -8,6 +8,7 @@ fantasy football draft assistant player database.
 
 import logging
 import re
+import threading
 from typing import List, Dict, Any, Optional, Tuple
 from mongo_utils import get_all_players
 
@@ -15,23 +16,86 @@ from mongo_utils import get_all_players
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Per-search scores that are attached to player records
+SCORE_FIELDS = ('search_score', 'value_score', 'sleeper_score')
+
 class PlayerSearchEngine:
     """Advanced player search and filtering engine"""
     
     def __init__(self):
         self.players_cache = []
         self.last_update = None
+        # (sort_by, sort_desc) -> players_cache sorted by that field
+        self._sorted_cache = {}
+        # (position, team, sort_by, sort_desc, available_only) -> unqueried search results
+        self._results_cache = {}
+        # (name, position) -> format_player_display(player) for every cached player
+        self._formatted_cache = {}
+        self._refresh_timer = None
         
     def refresh_cache(self) -> bool:
         """Refresh the players cache from database"""
         try:
-            self.players_cache = get_all_players()
+            players = get_all_players()
+            formatted = {self._display_key(p): format_player_display(p) for p in players}
+            # A background refresh can race request threads; the display cache
+            # is keyed by player identity, so entries stay correct across the swap
+            self.players_cache = players
+            self._sorted_cache = {}
+            self._results_cache = {}
+            self._formatted_cache = formatted
             logger.info(f"Refreshed cache with {len(self.players_cache)} players")
             return True
         except Exception as e:
             logger.error(f"Failed to refresh player cache: {e}")
             return False
     
+    def mark_drafted(self, player_name: str, drafted: bool) -> bool:
+        """Update a player's drafted status in the cache without reloading it
+        
+        Mirrors update_player_drafted_status, which updates the first player
+        with the given name. Returns False if the player is not cached.
+        """
+        for player in self.players_cache:
+            if player.get('name') == player_name:
+                player['drafted'] = drafted
+                self._formatted_cache[self._display_key(player)] = format_player_display(player)
+                # Availability filters (and sorts on the drafted field) are now stale
+                self._results_cache = {}
+                self._sorted_cache = {k: v for k, v in self._sorted_cache.items() if k[0] != 'drafted'}
+                return True
+        return False
+    
+    def start_background_refresh(self, interval: float = 60.0):
+        """Periodically reload the cache to pick up out-of-band database changes"""
+        def _refresh():
+            self.refresh_cache()
+            self.start_background_refresh(interval)
+        
+        self._refresh_timer = threading.Timer(interval, _refresh)
+        self._refresh_timer.daemon = True
+        self._refresh_timer.start()
+    
+    @staticmethod
+    def _display_key(player: Dict[str, Any]) -> Tuple[Any, Any]:
+        """Stable key for a player's display dict; (name, position) is unique in the store"""
+        return (player.get('name'), player.get('position'))
+    
+    def get_formatted(self, player: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the display dict for a player, reusing the cached copy when possible
+        
+        The returned dict is shared between requests and must not be mutated.
+        """
+        formatted = self._formatted_cache.get(self._display_key(player))
+        if formatted is None:
+            return format_player_display(player)
+        
+        # Scores are attached to players per search, so overlay them on the cached copy
+        if any(field in player for field in SCORE_FIELDS):
+            return {**formatted, **{field: player.get(field) for field in SCORE_FIELDS}}
+        
+        return formatted
+    
     def search_players(self, 
                       query: str = "", 
                       position: str = "", 
@@ -39,7 +103,8 @@ class PlayerSearchEngine:
                       max_results: int = 50,
                       sort_by: str = "projected_points",
                       sort_desc: bool = True,
-                      available_only: bool = True) -> List[Dict[str, Any]]:
+                      available_only: bool = True,
+                      offset: int = 0) -> List[Dict[str, Any]]:
         """
         Advanced player search with multiple filters
         
@@ -51,14 +116,56 @@ class PlayerSearchEngine:
             sort_by: Field to sort by (projected_points, avg_points, rank, name, age)
             sort_desc: Sort in descending order
             available_only: Only return undrafted players
+            offset: Number of matching players to skip (for pagination)
             
         Returns:
             List of matching players
         """
+        results = self._matching_players(query, position, team, sort_by, sort_desc, available_only)
+        return results[offset:offset + max_results]
+    
+    def search_players_page(self,
+                            query: str = "",
+                            position: str = "",
+                            team: str = "",
+                            page: int = 1,
+                            per_page: int = 20,
+                            sort_by: str = "projected_points",
+                            sort_desc: bool = True,
+                            available_only: bool = True) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Return a single page of search results along with the total match count
+        
+        Accepts the same filters as search_players.
+        
+        Returns:
+            Tuple of (players on the requested page, total matching players)
+        """
+        results = self._matching_players(query, position, team, sort_by, sort_desc, available_only)
+        start = (page - 1) * per_page
+        return results[start:start + per_page], len(results)
+    
+    def _matching_players(self, query: str, position: str, team: str,
+                          sort_by: str, sort_desc: bool, available_only: bool) -> List[Dict[str, Any]]:
+        """Filter and order the cached players; the returned list must not be mutated"""
         if not self.players_cache:
             self.refresh_cache()
         
-        results = self.players_cache.copy()
+        # Unqueried results depend only on the filters and sort, so they are reused
+        # until the cache changes (e.g. when paging through the same listing)
+        results_key = None
+        if not query:
+            results_key = ((position or '').upper(), (team or '').upper(), sort_by, sort_desc, available_only)
+            cached = self._results_cache.get(results_key)
+            if cached is not None:
+                return cached
+        
+        # Without a name query the order depends only on the sort field, so start
+        # from the pre-sorted list and let the filters below preserve its order
+        if not query and sort_by:
+            results = self._sorted_players(sort_by, sort_desc)
+        else:
+            results = self.players_cache
         
         # Filter by availability
         if available_only:
@@ -106,26 +213,37 @@ class PlayerSearchEngine:
                 results.sort(key=lambda x: (x['search_score'], x.get(sort_by, 0)), 
                            reverse=True)
         
-        # Sort by specified field if no search query
-        if not query and sort_by:
-            reverse_sort = sort_desc
-            try:
-                if sort_by in ['projected_points', 'avg_points', 'age', 'years_exp', 'weight']:
-                    # Numeric sorting
-                    results.sort(key=lambda x: float(x.get(sort_by, 0) or 0), reverse=reverse_sort)
-                elif sort_by == 'rank':
-                    # Rank sorting (lower rank number is better)
-                    results.sort(key=lambda x: int(x.get(sort_by, 999) or 999), reverse=False)
-                else:
-                    # String sorting
-                    results.sort(key=lambda x: str(x.get(sort_by, '')), reverse=reverse_sort)
-            except (ValueError, TypeError) as e:
-                logger.warning(f"Sort error for field {sort_by}: {e}")
-                # Fallback to projected_points
-                results.sort(key=lambda x: float(x.get('projected_points', 0) or 0), reverse=True)
-        
-        # Limit results
-        return results[:max_results]
+        if results_key is not None:
+            self._results_cache[results_key] = results
+        
+        return results
+    
+    def _sorted_players(self, sort_by: str, sort_desc: bool) -> List[Dict[str, Any]]:
+        """Return the cached players sorted by a field, sorting once per cache refresh"""
+        cache_key = (sort_by, sort_desc)
+        results = self._sorted_cache.get(cache_key)
+        if results is not None:
+            return results
+        
+        results = list(self.players_cache)
+        reverse_sort = sort_desc
+        try:
+            if sort_by in ['projected_points', 'avg_points', 'age', 'years_exp', 'weight']:
+                # Numeric sorting
+                results.sort(key=lambda x: float(x.get(sort_by, 0) or 0), reverse=reverse_sort)
+            elif sort_by == 'rank':
+                # Rank sorting (lower rank number is better)
+                results.sort(key=lambda x: int(x.get(sort_by, 999) or 999), reverse=False)
+            else:
+                # String sorting
+                results.sort(key=lambda x: str(x.get(sort_by, '')), reverse=reverse_sort)
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Sort error for field {sort_by}: {e}")
+            # Fallback to projected_points
+            results.sort(key=lambda x: float(x.get('projected_points', 0) or 0), reverse=True)
+        
+        self._sorted_cache[cache_key] = results
+        return results
     
     def _fuzzy_match(self, query: str, name: str, threshold: float = 0.7) -> bool:
         """Simple fuzzy matching for typos"""
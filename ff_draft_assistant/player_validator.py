@@ -189,6 +189,8 @@ class PlayerDataValidator:
         for player in valid_players:
             # Skip players without meaningful data
             if self._is_fantasy_relevant(player):
+                # detect_duplicates already ran validate_player_data on this record
+                player['_validated'] = True
                 fantasy_relevant.append(player)
         
         logger.info(f"Validation complete: {len(fantasy_relevant)} valid players from {len(players)} original")
@@ -0,0 +1,87 @@
+from ff_draft_assistant import adp_integration
+
+
+def test_cache_round_trip(tmp_path):
+    source = adp_integration.ADPDataSource()
+    source.cache_file = str(tmp_path / "adp_cache.json")
+    data = [{"name": "Josh Allen", "position": "QB", "team": "BUF", "adp": 12.5}]
+    source._cache_data(data, "ppr", 12, 2024)
+    assert source._get_cached_data("ppr", 12, 2024) == data
+    assert source._get_cached_data("standard", 12, 2024) is None
+
+
+def test_merge_adp_with_players():
+    source = adp_integration.ADPDataSource()
+    players = [
+        {"name": "Ja'Marr Chase", "position": "WR", "team": "CIN"},
+        {"name": "Nobody", "position": "TE", "team": "KC"},
+    ]
+    adp = [{"name": "JaMarr Chase", "position": "WR", "team": "CIN", "consensus_adp": 3.0,
+            "adp_data": {"ppr": 3.0}}]
+    merged = source.merge_adp_with_players(players, adp)
+    assert merged[0]["adp"] == 3.0
+    assert merged[0]["adp_data"] == {"ppr": 3.0}
+    assert "adp" not in players[0]
+    assert merged[1] is players[1]
+
+
+def test_cache_reloads_from_disk(tmp_path):
+    cache_file = str(tmp_path / "adp_cache.json")
+    writer = adp_integration.ADPDataSource()
+    writer.cache_file = cache_file
+    data = [{"name": "Josh Allen", "position": "QB", "team": "BUF", "adp": 12.5}]
+    writer._write_cache_file("half-ppr_12_2024", data, int(adp_integration.time.time()))
+
+    reader = adp_integration.ADPDataSource()
+    reader.cache_file = cache_file
+    assert reader._get_cached_data("half-ppr", 12, 2024) == data
+    assert ("half-ppr", 12, 2024) in reader._mem_cache
+
+
+def test_calculate_consensus_adp():
+    source = adp_integration.ADPDataSource()
+    multi = {
+        "ppr": [
+            {"name": "A", "position": "RB", "team": "SF", "adp": 2.0},
+            {"name": "B", "position": "WR", "team": "MIN", "adp": 1.0},
+        ],
+        "standard": [
+            {"name": "A", "position": "RB", "team": "SF", "adp": 1.0},
+            {"name": "B", "position": "WR", "team": "MIN", "adp": None},
+        ],
+    }
+    consensus = source.calculate_consensus_adp(multi)
+    assert [(p["name"], p["consensus_adp"]) for p in consensus] == [("B", 1.0), ("A", 1.5)]
+    assert consensus[1]["formats_count"] == 2
+
+
+def test_player_key_normalization():
+    key = adp_integration.ADPDataSource._player_key
+    assert key("Josh Allen", "qb", "buf") == "josh allen_QB_BUF"
+    assert key("  Ja'Marr   Chase ", "WR", "CIN") == "jamarr chase_WR_CIN"
+    assert key("Amon-Ra St. Brown", "WR", "DET") == "amon ra st brown_WR_DET"
+    assert key("Kenneth\tWalker III", "RB", "SEA") == "kenneth walker iii_RB_SEA"
+
+
+def test_merge_adp_with_players_in_place():
+    source = adp_integration.ADPDataSource()
+    players = [{"name": "Josh Allen", "position": "QB", "team": "BUF"}]
+    adp = [{"name": "Josh Allen", "position": "QB", "team": "BUF", "adp": 20.0}]
+    merged = source.merge_adp_with_players(players, adp, in_place=True)
+    assert merged[0] is players[0]
+    assert players[0]["adp"] == 20.0
+    assert players[0]["adp_data"] == {}
+
+
+def test_get_player_adp_history():
+    source = adp_integration.ADPDataSource()
+    lists = {
+        ("standard", 2023): [{"name": "Josh Allen", "position": "QB", "adp": 20.0}],
+        ("ppr", 2023): [{"name": "Josh Allen", "position": "WR", "adp": 99.0},
+                        {"name": "Josh Allen", "position": "QB", "adp": 22.0}],
+        ("standard", 2024): [],
+        ("ppr", 2024): [{"name": "Josh Allen", "position": "QB", "adp": 18.0}],
+    }
+    source.get_adp_data = lambda format_type, teams=12, year=None: lists[(format_type, year)]
+    history = source.get_player_adp_history("josh allen", "qb", years=[2023, 2024])
+    assert history == {2023: {"standard": 20.0, "ppr": 22.0}, 2024: {"ppr": 18.0}}
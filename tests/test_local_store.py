@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+from ff_draft_assistant import local_store as local_store_module
+from ff_draft_assistant.local_store import LocalDataStore
+
+PLAYERS = [
+    {"name": "A", "position": "RB", "team": "KC", "drafted": False},
+    {"name": "B", "position": "RB", "team": "SF", "drafted": False},
+    {"name": "C", "position": "QB", "team": "KC", "drafted": False},
+]
+
+@pytest.fixture
+def store(tmp_path):
+    store = LocalDataStore(str(tmp_path / "players.json"))
+    store.bulk_replace(PLAYERS)
+    yield store
+    store.flush()
+
+def names(players):
+    return [p["name"] for p in players]
+
+def test_search_multiple_fields(store):
+    assert names(store.search_players({"position": "RB"})) == ["A", "B"]
+    assert names(store.search_players({"position": "RB", "team": "KC"})) == ["A"]
+    assert store.search_players({"position": "TE"}) == []
+    assert names(store.search_players({})) == ["A", "B", "C"]
+
+def test_search_reflects_writes(store):
+    store.search_players({"position": "RB"})
+    store.insert_players([{"name": "D", "position": "RB", "team": "KC"}])
+    assert names(store.search_players({"position": "RB", "team": "KC"})) == ["A", "D"]
+
+    store.search_players({"drafted": True})
+    assert store.update_player_drafted_status("B", True) is True
+    assert names(store.search_players({"drafted": True})) == ["B"]
+    assert store.update_player_drafted_status("Missing", True) is False
+
+    store.clear_all_data()
+    assert store.search_players({"position": "RB"}) == []
+
+def test_unhashable_query_falls_back_to_scan(store):
+    store.insert_players([{"name": "E", "position": "WR", "byes": [7, 9]}])
+    assert names(store.search_players({"byes": [7, 9]})) == ["E"]
+    assert names(store.search_players({"position": "WR", "byes": [7, 9]})) == ["E"]
+
+def test_results_are_copies(store):
+    store.search_players({"team": "KC"})[0]["team"] = "LV"
+    store.get_all_players()[1]["team"] = "LV"
+    assert names(store.search_players({"team": "KC"})) == ["A", "C"]
+    assert store.search_players({"team": "LV"}) == []
+
+def test_drafted_update_is_deferred_until_flush(store, monkeypatch):
+    replaced = []
+    real_replace = local_store_module.os.replace
+    def spy_replace(src, dst):
+        replaced.append((src, dst))
+        real_replace(src, dst)
+    monkeypatch.setattr(local_store_module.os, "replace", spy_replace)
+    monkeypatch.setattr(local_store_module, "FLUSH_DELAY", 60.0)
+
+    store.update_player_drafted_status("A", True)
+    store.update_player_drafted_status("C", True)
+    assert replaced == []
+
+    store.flush()
+    assert replaced == [(store.file_path + ".tmp", store.file_path)]
+    with open(store.file_path) as f:
+        saved = json.load(f)
+    assert [p["name"] for p in saved if p["drafted"]] == ["A", "C"]
+    assert names(LocalDataStore(store.file_path).search_players({"drafted": True})) == ["A", "C"]
@@ -8,39 +8,93 @@ from importlib import reload
 sys.modules.setdefault("dotenv", types.SimpleNamespace(load_dotenv=lambda: None))
 
 class DummyMongoClient:
-    def __init__(self, uri):
+    def __init__(self, uri, **kwargs):
         pass
     def __getitem__(self, name):
         return self
 
-sys.modules.setdefault("pymongo", types.SimpleNamespace(MongoClient=DummyMongoClient))
+class DummyUpdateOne:
+    def __init__(self, filter, update, upsert=False):
+        self.filter = filter
+        self.update = update
+        self.upsert = upsert
+
+class DummyBulkWriteError(Exception):
+    def __init__(self, results):
+        super().__init__(results)
+        self.details = results
+
+sys.modules.setdefault("pymongo", types.SimpleNamespace(
+    MongoClient=DummyMongoClient,
+    UpdateOne=DummyUpdateOne,
+    WriteConcern=lambda **kwargs: kwargs,
+))
+sys.modules.setdefault("pymongo.errors", types.SimpleNamespace(BulkWriteError=DummyBulkWriteError))
 
 os.environ["MONGO_URI"] = "mongodb://localhost:27017"
 from ff_draft_assistant import mongo_utils as mongo_utils_module
 mongo_utils = reload(mongo_utils_module)
 
+class DummyCursor(list):
+    def batch_size(self, _):
+        return self
+
 class DummyCollection:
     def __init__(self):
         self.data = []
+        self.find_calls = 0
+        self.fail_writes = False
+
+    def with_options(self, **kwargs):
+        return self
+
+    def create_index(self, *args, **kwargs):
+        pass
 
     def delete_many(self, _):
         self.data = []
 
-    def insert_many(self, docs):
-        self.data.extend(docs)
+    def insert_many(self, docs, ordered=True):
+        new = [d for d in docs if d not in self.data]
+        self.data.extend(new)
+        if len(new) < len(docs):
+            raise mongo_utils.BulkWriteError({
+                "nInserted": len(new),
+                "writeErrors": [{"code": 11000}] * (len(docs) - len(new)),
+            })
+        return types.SimpleNamespace(inserted_ids=list(range(len(new))))
+
+    def bulk_write(self, operations, ordered=True):
+        if self.fail_writes:
+            raise RuntimeError("write failed")
+        matched = upserted = 0
+        for op in operations:
+            doc = next((d for d in self.data if self._match(d, op.filter)), None)
+            if doc is not None:
+                doc.update(op.update["$set"])
+                matched += 1
+            elif op.upsert:
+                self.data.append(dict(op.update["$set"]))
+                upserted += 1
+        return types.SimpleNamespace(
+            matched_count=matched, modified_count=matched, upserted_count=upserted
+        )
+
+    @staticmethod
+    def _match(doc, query):
+        return all(doc.get(k) == v for k, v in query.items())
 
     def find(self, query, projection=None):
-        def match(doc):
-            for k, v in query.items():
-                if doc.get(k) != v:
-                    return False
-            return True
-        return [d for d in self.data if match(d)]
+        self.find_calls += 1
+        return DummyCursor(dict(d) for d in self.data if self._match(d, query))
 
 @pytest.fixture
 def patched_mongo(monkeypatch):
     dummy = DummyCollection()
     monkeypatch.setattr(mongo_utils, "collection", dummy)
+    monkeypatch.setattr(mongo_utils, "mongodb_available", True)
+    monkeypatch.setattr(mongo_utils, "UpdateOne", DummyUpdateOne)
+    mongo_utils._clear_read_cache()
     return mongo_utils, dummy
 
 def test_insert_search_get_all(patched_mongo):
@@ -53,3 +107,75 @@ def test_insert_search_get_all(patched_mongo):
     assert dummy.data == players
     assert mu.search_players({"position": "RB"}) == [{"name": "A", "position": "RB"}]
     assert mu.get_all_players() == players
+
+def test_insert_players_upserts_existing(patched_mongo):
+    mu, dummy = patched_mongo
+    mu.insert_players([{"name": "A", "position": "RB", "adp": 10}])
+    mu.insert_players([{"name": "A", "position": "RB", "adp": 5}], batch_size=1)
+    assert dummy.data == [{"name": "A", "position": "RB", "adp": 5}]
+
+def test_bulk_insert_players_replaces_collection(patched_mongo):
+    mu, dummy = patched_mongo
+    dummy.data = [{"name": "Old", "position": "K"}]
+    players = [{"name": str(i), "position": "WR"} for i in range(5)]
+    mu.bulk_insert_players(players, batch_size=2, max_workers=2)
+    assert sorted(dummy.data, key=lambda p: int(p["name"])) == players
+
+def test_insert_batch_counts_past_duplicates(patched_mongo):
+    mu, dummy = patched_mongo
+    dummy.data = [{"name": "A", "position": "RB"}]
+    batch = [{"name": "A", "position": "RB"}, {"name": "B", "position": "QB"}]
+    assert mu._insert_batch(dummy, batch, 0) == 1
+    assert len(dummy.data) == 2
+
+def test_insert_batch_raises_other_write_errors(patched_mongo):
+    mu, dummy = patched_mongo
+    error = mu.BulkWriteError({"nInserted": 1, "writeErrors": [{"code": 11000}, {"code": 121}]})
+    def insert_many(docs, ordered=True):
+        raise error
+    dummy.insert_many = insert_many
+    with pytest.raises(mu.BulkWriteError):
+        mu._insert_batch(dummy, [{"name": "A"}, {"name": "B"}, {"name": "C"}], 0)
+
+def test_search_players_served_from_cache(patched_mongo):
+    mu, dummy = patched_mongo
+    dummy.data = [{"name": "A", "position": "RB"}]
+    first = mu.search_players({"position": "RB"})
+    first[0]["drafted"] = True
+    second = mu.search_players({"position": "RB"})
+    assert dummy.find_calls == 1
+    # Callers get copies, so mutating a result leaves the cache intact
+    assert second == [{"name": "A", "position": "RB"}]
+
+def test_write_invalidates_read_cache(patched_mongo):
+    mu, dummy = patched_mongo
+    dummy.data = [{"name": "A", "position": "RB", "drafted": False}]
+    mu.search_players({"position": "RB"})
+    assert mu.update_player_drafted_status("A", True) is True
+    assert mu.search_players({"position": "RB"}) == [
+        {"name": "A", "position": "RB", "drafted": True}
+    ]
+    assert dummy.find_calls == 2
+
+def test_unhashable_query_bypasses_cache(patched_mongo):
+    mu, dummy = patched_mongo
+    query = {"position": {"$in": ["RB", "QB"]}}
+    mu.search_players(query)
+    mu.search_players(query)
+    assert dummy.find_calls == 2
+    assert len(mu._read_cache) == 0
+
+def test_update_players_drafted_status_counts(patched_mongo):
+    mu, dummy = patched_mongo
+    dummy.data = [{"name": "A", "drafted": False}, {"name": "B", "drafted": False}]
+    counts = mu.update_players_drafted_status([("A", True), ("B", True), ("C", True)], batch_size=2)
+    assert counts == {"matched": 2, "modified": 2}
+    assert all(p["drafted"] for p in dummy.data)
+
+def test_update_player_drafted_status_failures(patched_mongo):
+    mu, dummy = patched_mongo
+    assert mu.update_player_drafted_status("Missing", True) is False
+    dummy.fail_writes = True
+    with pytest.raises(RuntimeError):
+        mu.update_players_drafted_status([("A", True)])
+    assert mu.update_player_drafted_status("A", True) is False
@@ -18,8 +18,54 @@ class DummyClient:
             )
         )
 
+def _reset_client_cache():
+    openai_parser.get_openai_api_key.cache_clear()
+    openai_parser._client.cache_clear()
+
 def test_parse_table_with_openai(monkeypatch):
+    _reset_client_cache()
     monkeypatch.setenv("OPENAI_API_KEY", "test-key")
     monkeypatch.setattr(openai_parser, "openai", types.SimpleNamespace(OpenAI=lambda api_key: DummyClient()))
     result = openai_parser.parse_table_with_openai("text", ["player", "position"])
     assert result == [{"player": "A", "position": "QB"}]
+
+def test_parse_table_with_openai_json_mode(monkeypatch):
+    _reset_client_cache()
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        return DummyResponse('{"rows": [{"player": "B", "position": "RB"}]}')
+
+    client = types.SimpleNamespace(chat=types.SimpleNamespace(completions=types.SimpleNamespace(create=create)))
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(openai_parser, "openai", types.SimpleNamespace(OpenAI=lambda api_key: client))
+    result = openai_parser.parse_table_with_openai("text", ["player", "position"])
+    assert result == [{"player": "B", "position": "RB"}]
+    assert calls[0]["response_format"] == {"type": "json_object"}
+
+
+def test_parse_table_with_openai_other_key(monkeypatch):
+    _reset_client_cache()
+    client = types.SimpleNamespace(chat=types.SimpleNamespace(completions=types.SimpleNamespace(
+        create=lambda **kwargs: DummyResponse('{"players": [{"player": "C", "position": "WR"}]}')
+    )))
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(openai_parser, "openai", types.SimpleNamespace(OpenAI=lambda api_key: client))
+    result = openai_parser.parse_table_with_openai("text", ["player", "position"])
+    assert result == [{"player": "C", "position": "WR"}]
+
+
+def test_openai_client_is_reused(monkeypatch):
+    _reset_client_cache()
+    created = []
+
+    def make_client(api_key):
+        created.append(api_key)
+        return DummyClient()
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(openai_parser, "openai", types.SimpleNamespace(OpenAI=make_client))
+    openai_parser.parse_table_with_openai("a", ["player", "position"])
+    openai_parser.parse_tables_batch(["b", "c", "d"], ["player", "position"])
+    assert created == ["test-key"]